@@ -0,0 +1,8 @@
+"""
+Restosaur micro-benchmarks
+
+Usage:
+
+    python -m benchmarks [--filter NAME] [--save FILE] [--compare FILE]
+
+"""
@@ -0,0 +1,69 @@
+import argparse
+import json
+import platform
+import sys
+
+import django
+from django.conf import settings
+
+settings.configure(**{
+    'ALLOWED_HOSTS': ['testserver'],
+    'INSTALLED_APPS': ['restosaur'],
+    'DEBUG': False,
+    })
+
+if hasattr(django, 'setup'):
+    django.setup()
+
+from . import base  # NOQA
+from . import bench_dispatch  # NOQA
+from . import bench_querydict  # NOQA
+from . import bench_routing  # NOQA
+from . import bench_representations  # NOQA
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            prog='python -m benchmarks',
+            description='Run restosaur micro-benchmarks')
+    parser.add_argument(
+            '-f', '--filter', action='append', dest='names',
+            help='run benchmarks containing NAME (may be repeated)')
+    parser.add_argument(
+            '-n', '--number', type=int, default=1000,
+            help='number of calls per repeat (default: %(default)s)')
+    parser.add_argument(
+            '-r', '--repeat', type=int, default=5,
+            help='number of repeats (default: %(default)s)')
+    parser.add_argument(
+            '--save', metavar='FILE', help='save results as JSON baseline')
+    parser.add_argument(
+            '--compare', metavar='FILE', help='compare with JSON baseline')
+    parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='relative slowdown reported as regression '
+                 '(default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = base.run(args.names, number=args.number, repeat=args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'results': results,
+                }, fh, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)['results']
+        sys.stdout.write('\n')
+        if base.compare(results, baseline, threshold=args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import gc
+import sys
+import timeit
+from collections import OrderedDict
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name, max_number=None):
+    """
+    Registers benchmark factory under the `name`.
+
+    The factory prepares fixtures and returns a callable, which
+    is a subject of measurements. Slow callables may limit number
+    of calls per repeat to `max_number`.
+    """
+
+    def wrap(factory):
+        factory.max_number = max_number
+        BENCHMARKS[name] = factory
+        return factory
+    return wrap
+
+
+def measure_time(func, number, repeat):
+    """
+    Returns the best time (in seconds) of a single `func` call
+    """
+
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_allocations(func):
+    """
+    Returns the number of memory blocks allocated by a single `func` call.
+
+    When `tracemalloc` is not available (Python 2), the number of
+    objects tracked by the garbage collector is returned instead.
+    """
+
+    func()  # warm up caches
+
+    if tracemalloc:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            func()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        stats = after.compare_to(before, 'filename')
+        return sum(max(stat.count_diff, 0) for stat in stats)
+
+    gc.collect()
+    gc.disable()
+    try:
+        before = gc.get_count()[0]
+        func()
+        after = gc.get_count()[0]
+    finally:
+        gc.enable()
+    return after - before
+
+
+def run(names=None, number=1000, repeat=5, out=sys.stdout):
+    results = OrderedDict()
+
+    for name, factory in BENCHMARKS.items():
+        if names and not any(x in name for x in names):
+            continue
+
+        func = factory()
+        results[name] = {
+            'time': measure_time(
+                func, min(number, factory.max_number or number), repeat),
+            'allocations': measure_allocations(func),
+            }
+        out.write('%-50s %12.2f us %10d allocs\n' % (
+            name, results[name]['time'] * 1e6,
+            results[name]['allocations']))
+        out.flush()
+
+    return results
+
+
+def compare(results, baseline, threshold=0.1, out=sys.stdout):
+    """
+    Compares `results` with `baseline` timings and returns names of
+    benchmarks slower by more than `threshold` (relative).
+    """
+
+    regressions = []
+
+    for name, result in results.items():
+        try:
+            base = baseline[name]['time']
+        except KeyError:
+            continue
+        change = (result['time'] - base) / base
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = ' REGRESSION'
+        out.write('%-50s %+8.1f%%%s\n' % (name, change * 100, flag))
+
+    return regressions
@@ -0,0 +1,164 @@
+"""
+Benchmarks of the request dispatch pipeline stages
+"""
+
+from django.test import RequestFactory
+
+from restosaur import API
+from restosaur.dispatch import build_context, resource_dispatcher_factory
+from restosaur.resource import http_response
+
+from .base import benchmark
+
+
+COLLECTION_SIZES = (10, 100, 1000)
+
+ACCEPT = 'application/vnd.item+json;q=0.9, application/json;q=0.8, */*;q=0.1'
+
+
+def item(pk):
+    return {
+        'id': pk,
+        'name': 'Item %d' % pk,
+        'description': 'Lorem ipsum dolor sit amet',
+        'price': pk * 1.5,
+        'tags': ['foo', 'bar', 'baz'],
+        }
+
+
+def setup_api():
+    api = API('api')
+    collection = api.resource('items')
+    entity = api.resource('items/:pk')
+    related = api.resource('items/:pk/related')
+
+    @collection.get(link_to=entity, link_as='collection')
+    def collection_GET(ctx):
+        return ctx.Collection(ctx.extra['items'])
+
+    @entity.get()
+    def entity_GET(ctx, pk):
+        return ctx.Entity(item(int(pk)))
+
+    @related.get(link_to=entity, link_as='related')
+    def related_GET(ctx, pk):
+        return ctx.Collection([])
+
+    @entity.representation()
+    @collection.representation()
+    def item_as_dict(obj, ctx):
+        return dict(obj)
+
+    @entity.representation('vnd.item')
+    def item_as_vnd(obj, ctx):
+        return {'id': obj['id']}
+
+    return api, collection, entity
+
+
+def get_request(path, **extra):
+    rqfactory = RequestFactory()
+    extra.setdefault('HTTP_ACCEPT', ACCEPT)
+    extra.setdefault('HTTP_USER_AGENT', 'restosaur-benchmark/1.0')
+    extra.setdefault('HTTP_ACCEPT_LANGUAGE', 'en-US,en;q=0.5')
+    return rqfactory.get(path, {'page': '1', 'tag': ['foo', 'bar']}, **extra)
+
+
+def negotiated_context(api, resource, request):
+    ctx = build_context(api, resource, request)
+    (ctx.response_content_type, ctx.serializer,
+        ctx.representation_name) = resource.negotiate(None)
+    return ctx
+
+
+@benchmark('dispatch.build_context')
+def bench_build_context():
+    api, collection, entity = setup_api()
+    request = get_request('/api/items/1')
+    return lambda: build_context(api, entity, request)
+
+
+@benchmark('resource.call')
+def bench_resource_call():
+    api, collection, entity = setup_api()
+    request = get_request('/api/items/1')
+    ctx = build_context(api, entity, request)
+    return lambda: entity(ctx, pk='1')
+
+
+@benchmark('dispatch.dispatch_request')
+def bench_dispatch_request():
+    api, collection, entity = setup_api()
+    dispatch = resource_dispatcher_factory(api, entity)
+    request = get_request('/api/items/1')
+    return lambda: dispatch(request, pk='1')
+
+
+@benchmark('response.serialize.entity_with_links')
+def bench_entity_serialize():
+    api, collection, entity = setup_api()
+    ctx = negotiated_context(api, entity, get_request('/api/items/1'))
+    response = ctx.Entity(item(1))
+    return lambda: response.serialize(response.data, ctx.representation_name)
+
+
+@benchmark('http_response.entity')
+def bench_entity_http_response():
+    api, collection, entity = setup_api()
+    ctx = negotiated_context(api, entity, get_request('/api/items/1'))
+    response = ctx.Entity(item(1))
+    return lambda: http_response(response)
+
+
+def collection_http_response_factory(size):
+    def factory():
+        api, collection, entity = setup_api()
+        ctx = negotiated_context(api, collection, get_request('/api/items'))
+        response = ctx.Collection([item(x) for x in range(size)])
+        return lambda: http_response(response)
+    return factory
+
+
+for size in COLLECTION_SIZES:
+    benchmark('http_response.collection[%d]' % size)(
+        collection_http_response_factory(size))
+
+
+class RequestMiddleware(object):
+    def process_request(self, request, context):
+        pass
+
+
+class ResponseMiddleware(object):
+    def process_response(self, request, response, context):
+        pass
+
+
+class Middleware(RequestMiddleware, ResponseMiddleware):
+    pass
+
+
+MIDDLEWARE_COUNTS = (0, 5, 20)
+
+MIDDLEWARE_TYPES = (Middleware, RequestMiddleware, ResponseMiddleware)
+
+
+def noop_resource(ctx, *args, **kw):
+    return None
+
+
+def middlewares_dispatch_factory(count):
+    def factory():
+        # resource call is skipped to measure the middlewares overhead
+        api = API('api', middlewares=[
+            MIDDLEWARE_TYPES[x % len(MIDDLEWARE_TYPES)]()
+            for x in range(count)])
+        dispatch = resource_dispatcher_factory(api, noop_resource)
+        request = get_request('/api/items/1')
+        return lambda: dispatch(request, pk='1')
+    return factory
+
+
+for count in MIDDLEWARE_COUNTS:
+    benchmark('dispatch.middlewares[%d]' % count)(
+        middlewares_dispatch_factory(count))
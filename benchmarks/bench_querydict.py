@@ -0,0 +1,46 @@
+"""
+Benchmarks of the query parameters mapping
+"""
+
+from django.test import RequestFactory
+
+from restosaur.context import QueryDict
+
+from .base import benchmark
+
+
+QUERY = {
+    'page': '2',
+    'limit': '50',
+    'ordering': '-published',
+    'q': 'lorem ipsum',
+    'tag': ['foo', 'bar', 'baz'],
+    }
+
+
+def get_request():
+    return RequestFactory().get('/api/items', QUERY)
+
+
+@benchmark('querydict.from_get')
+def bench_from_get():
+    request = get_request()
+    return lambda: QueryDict(request.GET.lists())
+
+
+@benchmark('querydict.items')
+def bench_items():
+    parameters = QueryDict(get_request().GET.lists())
+    return lambda: parameters.items()
+
+
+@benchmark('querydict.getitem')
+def bench_getitem():
+    parameters = QueryDict(get_request().GET.lists())
+    return lambda: (parameters['page'], parameters['tag'])
+
+
+@benchmark('querydict.urlencode')
+def bench_urlencode():
+    parameters = QueryDict(get_request().GET.lists())
+    return lambda: parameters.urlencode()
@@ -0,0 +1,74 @@
+"""
+Benchmarks of converting model instances into dicts
+"""
+
+import datetime
+
+from django.db import models
+
+from restosaur.representations import ModelRepresentation
+from restosaur.utils import model_to_dict
+
+from .base import benchmark
+
+
+INSTANCES = 10000
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+class Article(models.Model):
+    author = models.ForeignKey(Author, on_delete=models.CASCADE)
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    published = models.DateTimeField()
+    rating = models.IntegerField()
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+class ArticleRepresentation(ModelRepresentation):
+    model = Article
+
+
+class ArticleFieldsRepresentation(ModelRepresentation):
+    fields = (
+        'id', 'title', 'content', 'published', 'rating',
+        ('author_id', 'author.id'), ('author_name', 'author.name'))
+
+
+def articles():
+    author = Author(pk=1, name='John Doe')
+    published = datetime.datetime(2016, 7, 1, 12, 30)
+    return [
+        Article(
+            pk=x, author=author, title='Article %d' % x,
+            content='Lorem ipsum dolor sit amet', published=published,
+            rating=x % 5)
+        for x in range(INSTANCES)]
+
+
+@benchmark('representation.model_to_dict[%d]' % INSTANCES, max_number=10)
+def bench_model_to_dict():
+    objs = articles()
+    return lambda: [model_to_dict(obj, None) for obj in objs]
+
+
+@benchmark('representation.model[%d]' % INSTANCES, max_number=10)
+def bench_model_representation():
+    objs = articles()
+    convert = ArticleRepresentation().to_dict
+    return lambda: [convert(obj, None) for obj in objs]
+
+
+@benchmark('representation.fields[%d]' % INSTANCES, max_number=10)
+def bench_fields_representation():
+    objs = articles()
+    convert = ArticleFieldsRepresentation().to_dict
+    return lambda: [convert(obj, None) for obj in objs]
@@ -0,0 +1,50 @@
+"""
+Benchmarks of resolving resources by URL paths
+"""
+
+from restosaur import API
+
+from .base import benchmark
+
+
+RESOURCE_COUNT = 200
+
+
+def setup_api(single_route):
+    api = API('api', single_route=single_route)
+    for x in range(RESOURCE_COUNT):
+        api.resource('collection%d' % x)
+        api.resource('collection%d/:pk' % x)
+        api.resource('collection%d/:pk/related/:related_pk' % x)
+    return api
+
+
+PATH = '/api/collection%d/1/related/2' % (RESOURCE_COUNT - 1)
+
+
+def get_resolver(api):
+    from django.core.urlresolvers import RegexURLResolver
+    return RegexURLResolver(r'^/', api.get_urls())
+
+
+@benchmark('urls.resolve.regex[%d]' % (RESOURCE_COUNT * 3))
+def bench_regex_resolve():
+    resolver = get_resolver(setup_api(False))
+    return lambda: resolver.resolve(PATH)
+
+
+@benchmark('urls.resolve.single_route[%d]' % (RESOURCE_COUNT * 3))
+def bench_single_route_resolve():
+    from restosaur.routing import Router
+
+    api = setup_api(True)
+    resolver = get_resolver(api)
+    router = Router()
+    for resource in api.resources:
+        router.add(resource.path, resource)
+
+    def resolve():
+        # the catch-all view resolves the resource using its router
+        match = resolver.resolve(PATH)
+        return router.resolve(match.kwargs['path'])
+    return resolve
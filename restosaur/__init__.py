@@ -38,7 +38,9 @@ def autodiscover(module_name='restapi'):
 
 
 class API(object):
-    def __init__(self, path=None, resources=None, middlewares=None):
+    def __init__(
+            self, path=None, resources=None, middlewares=None,
+            instrumentation=None, single_route=False, compression=None):
         path = path or ''
         if path and not path.endswith('/'):
             path += '/'
@@ -47,6 +49,40 @@ class API(object):
         self.path = path
         self.resources = resources or []
         self.middlewares = middlewares or []
+        self.instrumentation = instrumentation
+        self.single_route = single_route
+        self.compression = compression
+
+    @property
+    def middlewares(self):
+        return self._middlewares
+
+    @middlewares.setter
+    def middlewares(self, middlewares):
+        from .dispatch import MiddlewareList
+        self._middlewares = MiddlewareList(
+                middlewares, on_change=self._reset_middleware_chain)
+        self._middleware_chain = None
+
+    def _reset_middleware_chain(self):
+        self._middleware_chain = None
+
+    @property
+    def middleware_chain(self):
+        """
+        Bound `process_request` and `process_response` methods
+        of middlewares, compiled once by `dispatch.compile_middlewares()`.
+
+        The chain is compiled again after `middlewares` are modified.
+        """
+
+        if self._middleware_chain is None:
+            from .dispatch import compile_middlewares
+            self._middleware_chain = compile_middlewares(self._middlewares)
+        return self._middleware_chain
+
+    def add_middlewares(self, *middlewares):
+        self._middlewares.extend(middlewares)
 
     def add_resources(self, *resources):
         self.resources += resources
@@ -57,6 +93,12 @@ class API(object):
         return obj
 
     def get_urls(self):
+        """
+        Returns URL patterns of API resources. With `single_route`
+        enabled, one catch-all pattern is registered and resources are
+        resolved by `restosaur.routing.Router`.
+        """
+
         try:
             from django.conf.urls import patterns, url, include
         except ImportError:
@@ -66,18 +108,30 @@ class API(object):
                 return list(urls)
 
         from django.views.decorators.csrf import csrf_exempt
-        from .dispatch import resource_dispatcher_factory
+        from .dispatch import (
+                resource_dispatcher_factory, route_dispatcher_factory)
+        from .routing import Router
         from . import urltemplate
 
         urls = []
 
-        for resource in self.resources:
-            path = urltemplate.to_django_urlpattern(resource._path)
-            if path.startswith('/'):
-                path = path[1:]
+        if self.single_route:
+            router = Router()
+            for resource in self.resources:
+                router.add(
+                    resource._path,
+                    resource_dispatcher_factory(self, resource))
             urls.append(url(
-                '^%s$' % path, csrf_exempt(
-                    resource_dispatcher_factory(self, resource))))
+                '^(?P<path>.*)$',
+                csrf_exempt(route_dispatcher_factory(router))))
+        else:
+            for resource in self.resources:
+                path = urltemplate.to_django_urlpattern(resource._path)
+                if path.startswith('/'):
+                    path = path[1:]
+                urls.append(url(
+                    '^%s$' % path, csrf_exempt(
+                        resource_dispatcher_factory(self, resource))))
 
         return [url('^%s' % self.path, include(patterns('', *urls)))]
 
@@ -0,0 +1,168 @@
+"""
+Server-side cache of rendered GET responses
+
+    from django.core.cache import caches
+    from restosaur.cache import ResponseCache
+
+    items = api.resource('items', cache=ResponseCache(timeout=60))
+    tags = api.resource('tags', cache=ResponseCache(caches['default']))
+
+Cached responses are stored per resource, request method, path, query
+parameters, negotiated content type and representation. Successful
+unsafe requests (POST, PUT, PATCH, DELETE) to the resource invalidate
+its cache. Responses are marked with `X-Cache: HIT` or `X-Cache: MISS`
+header.
+
+The cache key does not include the user, so cache only public
+resources or list the headers which vary the response (i.e.
+`Authorization`) in the `vary` argument.
+"""
+
+import hashlib
+import time
+
+from django.http import HttpResponse
+from django.utils.encoding import force_bytes
+
+from .utils import LRUCache
+
+
+# headers of cached response copied to 304 Not Modified responses
+NOT_MODIFIED_HEADERS = (
+        'Cache-Control', 'Content-Location', 'Expires', 'Last-Modified',
+        'Vary')
+
+
+class InProcessCache(object):
+    """
+    Bounded LRU cache of the current process, which implements
+    a subset of Django cache API.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._cache = LRUCache(maxsize)
+
+    def get(self, key, default=None):
+        item = self._cache.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires is not None and expires < time.time():
+            self._cache.delete(key)
+            return default
+        return value
+
+    def set(self, key, value, timeout=None):
+        expires = time.time() + timeout if timeout is not None else None
+        self._cache.set(key, (expires, value))
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class ResponseCache(object):
+    """
+    Caches rendered responses of a resource in the `backend`
+    (an instance of Django cache or `InProcessCache`) for `timeout`
+    seconds.
+    """
+
+    def __init__(
+            self, backend=None, timeout=300, key_prefix='restosaur',
+            vary=None):
+        self.backend = backend if backend is not None else InProcessCache()
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self.vary = tuple(vary or ())
+
+    def _generation_key(self, resource):
+        return '%s:generation:%s' % (
+                self.key_prefix,
+                hashlib.md5(force_bytes(resource.path)).hexdigest())
+
+    def get_generation(self, resource):
+        key = self._generation_key(resource)
+        generation = self.backend.get(key)
+        if generation is None:
+            # unique value prevents reusing entries of evicted generation
+            generation = int(time.time() * 1000000)
+            self.backend.set(key, generation, None)
+        return generation
+
+    def invalidate(self, resource):
+        """
+        Invalidates all cached responses of the `resource`
+        """
+
+        self.backend.delete(self._generation_key(resource))
+
+    def invalidate_on(self, signal, resource, **kwargs):
+        """
+        Connects Django `signal` to invalidation of `resource` cache
+        """
+
+        def receiver(*args, **kw):
+            self.invalidate(resource)
+
+        signal.connect(receiver, weak=False, **kwargs)
+        return receiver
+
+    def get_cache_key(self, ctx, method=None):
+        parts = [
+            method or ctx.method,
+            ctx.request.path,
+            sorted(ctx.parameters.lists()),
+            ctx.response_content_type,
+            ctx.representation_name,
+            ]
+        parts.extend(ctx.headers.get(header) for header in self.vary)
+        compression = getattr(ctx.api, 'compression', None)
+        if compression is not None:
+            encoder = compression.negotiate(ctx.headers.get('accept-encoding'))
+            parts.append(encoder and encoder.name)
+        return '%s:response:%s:%s' % (
+                self.key_prefix, self.get_generation(ctx.resource),
+                hashlib.md5(force_bytes(repr(parts))).hexdigest())
+
+    def get_response(self, ctx, key):
+        """
+        Returns cached `HttpResponse` stored under the `key`, or None
+        """
+
+        cached = self.backend.get(key)
+
+        if cached is None:
+            return
+
+        status, content, headers = cached
+        httpresp = HttpResponse(content, status=status)
+        for header, value in headers:
+            httpresp[header] = value
+
+        etag = httpresp.get('ETag')
+        if etag and ctx.etag_matches(etag):
+            cached = httpresp
+            httpresp = HttpResponse('', status=304)
+            httpresp['ETag'] = etag
+            for header in NOT_MODIFIED_HEADERS:
+                if cached.has_header(header):
+                    httpresp[header] = cached[header]
+
+        httpresp['X-Cache'] = 'HIT'
+        return httpresp
+
+    def set_response(self, key, httpresp):
+        """
+        Stores successful, non-streaming `httpresp` under the `key`
+        """
+
+        if httpresp.status_code != 200 or httpresp.streaming:
+            return
+
+        self.backend.set(
+                key, (httpresp.status_code, httpresp.content,
+                      list(httpresp.items())), self.timeout)
+        httpresp['X-Cache'] = 'MISS'
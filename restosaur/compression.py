@@ -0,0 +1,271 @@
+"""
+Compression of response bodies negotiated by `Accept-Encoding` header
+
+    from restosaur.compression import Compression
+
+    api = API('api', compression=Compression(min_size=1024))
+
+Responses of compressible content types (`Compression.content_types`)
+are compressed using the best encoding accepted by the client. Supported
+encodings are `br` (requires `brotli` or `brotlicffi` package), `zstd`
+(requires `zstandard` package) and `gzip`. When the client accepts
+several of them with the same quality, they're preferred in that order.
+
+Bodies smaller than `min_size` bytes are sent uncompressed. Streamed
+responses are compressed chunk by chunk, regardless of their size.
+Responses of compressible content types get `Vary: Accept-Encoding`
+header, and their strong ETags are made weak when an encoding is
+negotiated, even if the body is too small to be compressed. 304 Not
+Modified responses get the same headers, so they carry the validator
+sent with the full response.
+"""
+
+import re
+import zlib
+
+from .headers import parse_accept_encoding
+from .utils import LRUCache
+
+
+DEFAULT_CONTENT_TYPES = (
+        'application/json', 'application/xml', 'application/javascript',
+        'text/*')
+
+RE_STRONG_ETAG = re.compile(r'^"[^"]*"$')
+
+_missing = object()
+
+
+class EncoderUnavailable(Exception):
+    pass
+
+
+class GzipEncoder(object):
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def _compressobj(self):
+        # 16 + MAX_WBITS selects gzip container
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        compressor = self._compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_iter(self, chunks):
+        compressor = self._compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliEncoder(object):
+    name = 'br'
+
+    def __init__(self, quality=4):
+        try:
+            import brotli
+        except ImportError:
+            try:
+                import brotlicffi as brotli
+            except ImportError:
+                raise EncoderUnavailable(self.name)
+        self._brotli = brotli
+        self.quality = quality
+
+    def compress(self, data):
+        return self._brotli.compress(data, quality=self.quality)
+
+    def compress_iter(self, chunks):
+        compressor = self._brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ZstdEncoder(object):
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        try:
+            import zstandard
+        except ImportError:
+            raise EncoderUnavailable(self.name)
+        self._zstandard = zstandard
+        self.level = level
+
+    def _compressor(self):
+        # compressors must not be shared between threads
+        return self._zstandard.ZstdCompressor(level=self.level)
+
+    def compress(self, data):
+        return self._compressor().compress(data)
+
+    def compress_iter(self, chunks):
+        compressor = self._compressor().compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            data += compressor.flush(self._zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def available_encoders():
+    """
+    Returns instances of available encoders in order of preference
+    """
+
+    encoders = []
+    for encoder_class in (BrotliEncoder, ZstdEncoder, GzipEncoder):
+        try:
+            encoders.append(encoder_class())
+        except EncoderUnavailable:
+            pass
+    return encoders
+
+
+def content_type_matches(content_type, patterns):
+    """
+    Checks whether `content_type` (optionally with a vendor, i.e.
+    `application/vnd.item+json`) matches any of `type/subtype`
+    or `type/*` patterns.
+    """
+
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    type_, _, subtype = mimetype.partition('/')
+    candidates = set([mimetype, '%s/*' % type_])
+    if '+' in subtype:
+        candidates.add('%s/%s' % (type_, subtype.rpartition('+')[2]))
+    return any(pattern in candidates for pattern in patterns)
+
+
+class Compression(object):
+    """
+    Response compression policy.
+
+    `encoders` are instances of encoders in order of preference
+    (all available encoders by default), `min_size` is a minimal size
+    of compressed body in bytes, and `content_types` is a list of
+    compressible content types (`type/subtype` or `type/*`).
+    """
+
+    def __init__(
+            self, min_size=1024, content_types=DEFAULT_CONTENT_TYPES,
+            encoders=None, cache_size=64):
+        self.min_size = min_size
+        self.content_types = tuple(content_types)
+        self.encoders = tuple(
+                encoders if encoders is not None else available_encoders())
+        self._negotiation_cache = LRUCache(cache_size)
+
+    def negotiate(self, accept_encoding):
+        """
+        Returns the best encoder accepted by the `accept_encoding`
+        header value, or None
+        """
+
+        if not accept_encoding:
+            return None
+
+        encoder = self._negotiation_cache.get(accept_encoding, _missing)
+
+        if encoder is _missing:
+            encoder = self._negotiate(accept_encoding)
+            self._negotiation_cache.set(accept_encoding, encoder)
+
+        return encoder
+
+    def _negotiate(self, accept_encoding):
+        codings = parse_accept_encoding(accept_encoding)
+        default = codings.get('*', 0.0)
+        best, best_quality = None, 0.0
+
+        for encoder in self.encoders:
+            quality = codings.get(encoder.name, default)
+            if quality > best_quality:
+                best, best_quality = encoder, quality
+
+        return best
+
+    def is_compressible(self, httpresp):
+        content_type = httpresp.get('Content-Type')
+        return bool(
+                content_type and
+                content_type_matches(content_type, self.content_types))
+
+    def patch_headers(self, context, httpresp, content_type):
+        """
+        Patches `Vary` header of `httpresp` (in place) and weakens its
+        ETag if a compressible `content_type` will be encoded. Returns
+        the negotiated encoder, or None.
+        """
+
+        if not content_type or not content_type_matches(
+                content_type, self.content_types):
+            return None
+
+        from django.utils.cache import patch_vary_headers
+
+        patch_vary_headers(httpresp, ('Accept-Encoding',))
+
+        encoder = self.negotiate(context.headers.get('accept-encoding'))
+
+        if encoder is None:
+            return None
+
+        etag = httpresp.get('ETag')
+
+        if etag and RE_STRONG_ETAG.match(etag):
+            httpresp['ETag'] = 'W/' + etag
+
+        return encoder
+
+    def compress_response(self, context, httpresp):
+        """
+        Compresses body of `httpresp` (in place) using encoding
+        negotiated for the request `context`
+        """
+
+        if httpresp.status_code == 304:
+            # headers of the response which would be sent in full
+            self.patch_headers(
+                    context, httpresp,
+                    getattr(context, 'response_content_type', None))
+            return httpresp
+
+        if (httpresp.status_code < 200 or httpresp.status_code == 204
+                or httpresp.has_header('Content-Encoding')):
+            return httpresp
+
+        encoder = self.patch_headers(
+                context, httpresp, httpresp.get('Content-Type'))
+
+        if encoder is None:
+            return httpresp
+
+        if httpresp.streaming:
+            httpresp.streaming_content = encoder.compress_iter(
+                    httpresp.streaming_content)
+            if httpresp.has_header('Content-Length'):
+                del httpresp['Content-Length']
+        else:
+            content = httpresp.content
+            if len(content) < self.min_size:
+                return httpresp
+            compressed = encoder.compress(content)
+            if len(compressed) >= len(content):
+                return httpresp
+            httpresp.content = compressed
+            if httpresp.has_header('Content-Length'):
+                httpresp['Content-Length'] = str(len(compressed))
+
+        httpresp['Content-Encoding'] = encoder.name
+        return httpresp
@@ -2,14 +2,15 @@ import collections
 import email
 import types
 import urllib
-import urlparse
 
 import responses
 import times
 # todo: implement own conversion utility
 from django.utils.encoding import force_bytes
 
+from .headers import Headers, parse_etags
 from .loading import load_resource
+from .representations import parse_fields
 
 
 def parse_http_date(header, headers):
@@ -21,7 +22,41 @@ def parse_http_date(header, headers):
             pass
 
 
-class QueryDict(collections.MutableMapping):
+_missing = object()
+
+
+def request_body(request):
+    try:
+        # Django may raise RawPostDataException sometimes;
+        # i.e. when processing POST multipart/form-data;
+        # In that cases we can't access raw body anymore, sorry
+
+        return request.body
+    except:
+        return None
+
+
+def request_parameters(request):
+    """
+    Returns `QueryDict` of URL keyword arguments updated with
+    query string parameters of the `request`
+    """
+
+    parameters = QueryDict()
+    resolver_match = getattr(request, 'resolver_match', None)
+
+    if resolver_match:
+        parameters.update(resolver_match.kwargs)
+
+    query = getattr(request, 'GET', None)
+
+    if query:
+        parameters.setlists(query.lists())
+
+    return parameters
+
+
+class QueryDict(object):
     """
     QueryDict acts like a plain `dict` type, but it handles
     automatially multiple values for same key.
@@ -46,42 +81,77 @@ class QueryDict(collections.MutableMapping):
     `.items()` method returns a list of (key, value) tuples, where value is
     a single value from a key's values list. This means that key may not be
     unique. This representation is compatible with `urllib.urlencode()`.
+    `.iteritems()` generates same tuples lazily and `.urlencode()` builds
+    a query string from them.
 
     `.keys()` returns unique key names, same as for pure `dict`.
 
     `.values()` returns list of same values, which can be accessed by key,
 
     `.lists()` returns internal representation as list of lists.
+
+    QueryDict is registered as a `MutableMapping`, but does not inherit
+    from it, so instances have no `__dict__`.
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, initial=None):
         self._data = {}
-        self.update(initial)
+        if initial is not None:
+            self.update(initial)
 
     def update(self, data):
         if data is None:
             return
-        else:
-            try:
-                data = data.items()
-            except AttributeError:
-                pass
-            finally:
-                keys = set([x[0] for x in data])
-                for key in keys:
-                    self._data[key] = []
-                for key, value in data:
-                    if isinstance(value, (types.ListType, types.TupleType)):
-                        for x in value:
-                            self._data[key].append(x)
-                    else:
-                        self._data[key].append(value)
+
+        store = self._data
+
+        if isinstance(data, QueryDict):
+            for key, values in data._data.iteritems():
+                store[key] = list(values)
+            return
+
+        try:
+            data = data.items()
+        except AttributeError:
+            pass
+
+        replaced = set()
+
+        for key, value in data:
+            if key in replaced:
+                values = store[key]
+            else:
+                store[key] = values = []
+                replaced.add(key)
+            if isinstance(value, (list, tuple)):
+                values.extend(value)
+            else:
+                values.append(value)
+
+    def setlists(self, lists):
+        """
+        Replaces values of keys with `(key, values)` pairs,
+        i.e. returned by Django's `QueryDict.lists()`
+        """
+
+        store = self._data
+        for key, values in lists:
+            store[key] = list(values)
+
+    def iteritems(self):
+        for key, values in self._data.iteritems():
+            for value in values:
+                yield key, value
 
     def items(self):
-        result = []
-        for key, values in self._data.items():
-            result += map(lambda x: (key, x), values)
-        return result
+        return list(self.iteritems())
+
+    def urlencode(self, encoding=None):
+        return urllib.urlencode([
+            (key, force_bytes(value, encoding or 'utf-8'))
+            for key, value in self.iteritems()])
 
     def getlist(self, key, default=None):
         return self._data.get(key, default)
@@ -89,44 +159,210 @@ class QueryDict(collections.MutableMapping):
     def lists(self):
         return self._data.items()
 
+    def keys(self):
+        return self._data.keys()
+
+    def iterkeys(self):
+        return iter(self._data)
+
+    def values(self):
+        return [self[key] for key in self._data]
+
+    def itervalues(self):
+        for key in self._data:
+            yield self[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        try:
+            value = self[key]
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+        del self._data[key]
+        return value
+
+    def popitem(self):
+        key, values = self._data.popitem()
+        return key, values[-1] if len(values) < 2 else values
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def copy(self):
+        return QueryDict(self)
+
     def __setitem__(self, key, value):
-        return self.update({key: value})
+        if isinstance(value, (list, tuple)):
+            self._data[key] = list(value)
+        else:
+            self._data[key] = [value]
 
     def __getitem__(self, key):
-        return self._data[key][-1]\
-                if len(self._data[key]) < 2 else self._data[key]
+        values = self._data[key]
+        return values[-1] if len(values) < 2 else values
 
     def __delitem__(self, key):
         del self._data[key]
 
+    def __contains__(self, key):
+        return key in self._data
+
     def __len__(self):
         return len(self._data)
 
     def __iter__(self):
         return iter(self._data)
 
+    def __eq__(self, other):
+        if not isinstance(other, collections.Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
     def __repr__(self):
         return repr(self._data)
 
 
+collections.MutableMapping.register(QueryDict)
+
+
 class Context(object):
+    """
+    Request context passed to resource callbacks.
+
+    Request `parameters`, `raw` body, form `data` and `files`, which
+    are not passed explicitely, are read from the `request` on first
+    access, so requests which don't use them do no body I/O at all.
+    """
+
     def __init__(
             self, api, request, resource, method, parameters=None,
             body=None, data=None, files=None, raw=None, extra=None,
             headers=None):
         self.method = method
         self.api = api
-        self.headers = headers or {}
+        self.headers = Headers(getattr(request, 'META', None), headers)
         self.request = request
         self.body = body
-        self.raw = raw
         self.resource = resource
-        self.parameters = QueryDict(parameters)  # GET
-        self.data = data or {}  # POST
-        self.files = files or {}  # FILES
         self.deserializer = None
         self.content_type = None
         self.extra = extra or {}
+        self.timer = None
+        self._base_uri = None
+        self._parameters = (
+                QueryDict(parameters) if parameters is not None else _missing)
+        self._raw = raw if raw is not None else _missing
+        self._data = data if data is not None else _missing
+        self._files = files if files is not None else _missing
+        self._fields = _missing
+
+    @property
+    def parameters(self):
+        """
+        URI parameters and query string wrapped with `QueryDict` (GET)
+        """
+
+        parameters = self._parameters
+        if parameters is _missing:
+            parameters = request_parameters(self.request)
+        elif not isinstance(parameters, QueryDict):
+            parameters = QueryDict(parameters)
+        self._parameters = parameters
+        return parameters
+
+    @parameters.setter
+    def parameters(self, value):
+        self._parameters = value
+
+    @property
+    def raw(self):
+        """
+        Raw request body, or None if it can't be read
+        """
+
+        if self._raw is _missing:
+            self._raw = request_body(self.request)
+        return self._raw
+
+    @raw.setter
+    def raw(self, value):
+        self._raw = value
+
+    @property
+    def data(self):
+        """
+        Form data of the request (POST)
+        """
+
+        if self._data is _missing:
+            self._data = getattr(self.request, 'POST', None) or {}
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def files(self):
+        """
+        Uploaded files of the request (FILES)
+        """
+
+        if self._files is _missing:
+            self._files = getattr(self.request, 'FILES', None) or {}
+        return self._files
+
+    @files.setter
+    def files(self, value):
+        self._files = value
+
+    @property
+    def fields(self):
+        """
+        Frozenset of field names requested by the `fields` query
+        parameter (sparse fieldset), or None if all fields are requested
+        """
+
+        if self._fields is _missing:
+            from .settings import FIELDS_PARAMETER
+            self._fields = parse_fields(
+                    self.parameters.getlist(FIELDS_PARAMETER) or ())
+        return self._fields
+
+    @fields.setter
+    def fields(self, value):
+        self._fields = value
+
+    @property
+    def base_uri(self):
+        """
+        Scheme and host part of the request URI, computed once per context
+        """
+
+        if self._base_uri is None:
+            self._base_uri = 'http%s://%s' % (
+                    's' if self.request.is_secure() else '',
+                    self.request.get_host())
+        return self._base_uri
 
     def build_absolute_uri(self, path=None, parameters=None):
         """
@@ -138,33 +374,22 @@ class Context(object):
         optional `parameters`.
         """
 
-        def build_uri(path):
-            current = 'http%s://%s%s' % (
-                    's' if self.request.is_secure() else '',
-                    self.request.get_host(), self.request.path)
-            return urlparse.urljoin(current, path)
-
         params = QueryDict()
         if path:
             full_path = u'/'.join(
                     filter(None, (self.api.path+path).split('/')))
             if path.endswith('/'):
                 full_path += '/'
-            uri = build_uri('/'+full_path)
+            uri = self.base_uri + '/' + full_path.lstrip('/')
         else:
-            params.update(self.parameters.items())
-            uri = build_uri(self.request.path)
-
-        # todo: change to internal restosaur settings
-        enc = self.request.GET.encoding
+            params.update(self.parameters)
+            uri = self.base_uri + self.request.path
 
-        params.update(parameters or {})
-        params = map(
-                lambda x: (x[0], force_bytes(x[1], enc)),
-                params.items())
+        params.update(parameters)
 
         if params:
-            return '%s?%s' % (uri, urllib.urlencode(params))
+            # todo: change to internal restosaur settings
+            return '%s?%s' % (uri, params.urlencode(self.request.GET.encoding))
         else:
             return uri
 
@@ -190,6 +415,23 @@ class Context(object):
 
         return True
 
+    def etag_matches(self, etag):
+        """
+        Compares `etag` with `If-None-Match` header value using the weak
+        comparison. Returns True if the header matches `etag`,
+        False otherwise.
+        """
+
+        if_none_match = self.headers.get('if-none-match')
+
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        return etag in parse_etags(if_none_match)
+
     @property
     def deserialized(self):
         return self.body
@@ -0,0 +1,99 @@
+"""
+Strategies of counting collection items
+
+A strategy is a function `strategy(iterable, length)`, where `length`
+is the number of items already fetched from the `iterable`, which
+returns `totalCount` of a collection response.
+
+Strategies may be selected per response by name:
+
+    ctx.Collection(queryset, count='estimate')
+
+  * `'len'` (or True) - number of fetched items (no extra queries)
+  * `'queryset'` - `iterable.count()`, i.e. `SELECT COUNT(*)`
+  * `'estimate'` - planner estimate on PostgreSQL, `count()` otherwise
+  * None (or False) - `totalCount` is not returned
+"""
+
+import json
+
+
+def count_items(iterable, length):
+    return length
+
+
+def count_queryset(iterable, length):
+    try:
+        return iterable.count()
+    except (AttributeError, TypeError):
+        return length
+
+
+def estimate_count(iterable, length):
+    """
+    Returns estimated number of rows of the `iterable` queryset.
+
+    On PostgreSQL statistics of the table (`reltuples`) are used for
+    unfiltered querysets, and the query planner estimate otherwise.
+    Exact count is returned for other databases or when statistics are
+    not available.
+    """
+
+    from django.db import connections
+
+    try:
+        query = iterable.query
+        connection = connections[iterable.db]
+    except AttributeError:
+        return length
+
+    if connection.vendor != 'postgresql':
+        return count_queryset(iterable, length)
+
+    # cursors are context managers since Django 1.7
+    cursor = connection.cursor()
+    try:
+        if not query.where:
+            cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    [iterable.model._meta.db_table])
+            row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            sql, params = query.sql_with_params()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if not isinstance(plan, list):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+    finally:
+        cursor.close()
+
+    if estimate is None or estimate < 0:
+        # table was never analyzed
+        return count_queryset(iterable, length)
+
+    return int(estimate)
+
+
+COUNT_STRATEGIES = {
+    'len': count_items,
+    'queryset': count_queryset,
+    'estimate': estimate_count,
+    }
+
+
+def get_count_strategy(count):
+    """
+    Returns counting function for the `count` argument of a collection
+    response, or None if items should not be counted.
+    """
+
+    if count is True:
+        return count_items
+    if not count:
+        return None
+    if callable(count):
+        return count
+    return COUNT_STRATEGIES[count]
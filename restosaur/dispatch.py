@@ -1,66 +1,142 @@
-from .context import Context, QueryDict
+from .context import Context
+from .instrumentation import StageTimer, clock
 
 
 def build_context(api, resource, request):
-    try:
-        # Django may raise RawPostDataException sometimes;
-        # i.e. when processing POST multipart/form-data;
-        # In that cases we can't access raw body anymore, sorry
+    # request parameters and body are read lazily by the context
+    return Context(
+            api, request=request, resource=resource, method=request.method)
+
+
+def compile_middlewares(middlewares):
+    """
+    Returns a tuple of `(index, process_request)` pairs in calling order,
+    and a tuple of `(index, process_response)` pairs in reversed order,
+    where `index` is a position of the middleware in `middlewares`.
+    """
+
+    process_request = []
+    process_response = []
+
+    for index, middleware in enumerate(middlewares):
+        method = getattr(middleware, 'process_request', None)
+        if method is not None:
+            process_request.append((index, method))
+        method = getattr(middleware, 'process_response', None)
+        if method is not None:
+            process_response.append((index, method))
+
+    process_response.reverse()
+    return tuple(process_request), tuple(process_response)
+
 
-        raw_body = request.body
-    except:
-        raw_body = None
+class MiddlewareList(list):
+    """
+    List of middlewares which calls `on_change()` after every in-place
+    modification, so the compiled chain can be invalidated
+    """
 
-    parameters = {}
+    def __init__(self, middlewares=(), on_change=None):
+        super(MiddlewareList, self).__init__(middlewares)
+        self.on_change = on_change
 
-    if request.resolver_match:
-        parameters.update(request.resolver_match.kwargs)
 
-    parameters.update(QueryDict(request.GET.lists()))
+def _notifying(name):
+    method = getattr(list, name)
 
-    ctx = Context(
-            api, request=request, resource=resource,
-            method=request.method, parameters=parameters, data=request.POST,
-            files=request.FILES, raw=raw_body)
+    def wrapper(self, *args):
+        result = method(self, *args)
+        if self.on_change is not None:
+            self.on_change()
+        return result
 
-    return ctx
+    wrapper.__name__ = name
+    return wrapper
 
 
-def resource_dispatcher_factory(api, resource):
+for _name in (
+        'append', 'extend', 'insert', 'pop', 'remove', 'reverse', 'sort',
+        '__setitem__', '__delitem__', '__setslice__', '__delslice__',
+        '__iadd__', '__imul__'):
+    setattr(MiddlewareList, _name, _notifying(_name))
+
+del _name
+
+
+def resource_dispatcher_factory(api, resource, instrumentation=None):
     from django.http import HttpResponse
 
+    sink = instrumentation or api.instrumentation
+
     def dispatch_request(request, *args, **kw):
+        if sink:
+            request_started = started = clock()
+
         ctx = build_context(api, resource, request)
-        bypass_resource_call = False
-        middlewares_called = []
-
-        for middleware in api.middlewares:
-            middlewares_called.append(middleware)
-
-            try:
-                method = middleware.process_request
-            except AttributeError:
-                pass
-            else:
-                if method(request, ctx) is False:
-                    bypass_resource_call = True
-                    break
-
-        if not bypass_resource_call:
+
+        if sink:
+            ctx.timer = timer = StageTimer(sink, ctx)
+            timer.record('context', started)
+            started = clock()
+
+        process_request, process_response = api.middleware_chain
+
+        # index of the middleware which bypassed the resource call
+        bypassed_by = None
+
+        for index, method in process_request:
+            if method(request, ctx) is False:
+                bypassed_by = index
+                break
+
+        if sink:
+            timer.record('middleware.request', started)
+
+        if bypassed_by is None:
             response = resource(ctx, *args, **kw)
         else:
             response = HttpResponse()
 
-        middlewares_called.reverse()
+        if sink:
+            started = clock()
 
-        for middleware in middlewares_called:
-            try:
-                method = middleware.process_response
-            except AttributeError:
-                pass
-            else:
-                if method(request, response, ctx) is False:
-                    break
+        for index, method in process_response:
+            if bypassed_by is not None and index > bypassed_by:
+                # request of this middleware was not processed
+                continue
+            if method(request, response, ctx) is False:
+                break
+
+        if sink:
+            timer.record('middleware.response', started)
+            timer.record('request', request_started)
 
         return response
     return dispatch_request
+
+
+def route_dispatcher_factory(router):
+    """
+    Returns a view resolving resource dispatchers registered
+    in the `router` by the `path` URL keyword argument
+    """
+
+    from django.http import Http404
+
+    try:
+        from django.urls import ResolverMatch
+    except ImportError:
+        from django.core.urlresolvers import ResolverMatch
+
+    def dispatch_route(request, path):
+        match = router.resolve(path)
+
+        if match is None:
+            raise Http404(path)
+
+        dispatch, kwargs = match
+
+        # URL parameters of the context are read from the resolver match
+        request.resolver_match = ResolverMatch(dispatch, (), kwargs)
+        return dispatch(request, **kwargs)
+    return dispatch_route
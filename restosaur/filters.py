@@ -1,7 +1,17 @@
 from .forms import Form
 
 
-def filter_form_factory(model):
+# filter form classes of models, built once per process
+
+_filter_forms = {}
+
+
+def build_filter_form(model):
+    """
+    Returns a new filter form class with optional form fields
+    of concrete fields of the `model`
+    """
+
     fields = []
 
     for field in model._meta.fields:
@@ -16,6 +26,27 @@ def filter_form_factory(model):
     return type(Form)(model.__name__ + str('FilterForm'), (Form,), fields)
 
 
+def filter_form_factory(model):
+    """
+    Cached version of `build_filter_form()`
+    """
+
+    try:
+        return _filter_forms[model]
+    except KeyError:
+        form_class = _filter_forms[model] = build_filter_form(model)
+        return form_class
+
+
+def clear_filter_forms():
+    """
+    Clears cached filter form classes, i.e. when models are redefined
+    in tests
+    """
+
+    _filter_forms.clear()
+
+
 class QuerysetFilter(object):
     def __init__(self, queryset, form_class=None):
         self.form_class = form_class or filter_form_factory(queryset.model)
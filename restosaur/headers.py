@@ -1,3 +1,4 @@
+import collections
 
 
 def parse_accept_header(accept):
@@ -35,8 +36,163 @@ def build_content_type_header(content_type, vendor):
         return content_type
 
 
+def parse_accept_encoding(value):
+    """
+    Parses `Accept-Encoding` header value into a dict of content
+    codings (lowercased) and their qualities
+    """
+
+    codings = {}
+    for item in value.split(','):
+        parts = item.split(';')
+        coding = parts.pop(0).strip().lower()
+        if not coding:
+            continue
+        if coding == 'x-gzip':
+            coding = 'gzip'
+        quality = 1.0
+        for part in parts:
+            key, _, param = part.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(param)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def parse_etags(value):
+    """
+    Parses `If-Match` / `If-None-Match` header value into a list of
+    entity tags. Weakness indicators are stripped, so the tags can be
+    compared using the weak comparison function.
+    """
+
+    etags = []
+    for etag in value.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        if etag:
+            etags.append(etag)
+    return etags
+
+
 def normalize_header_name(header):
     header = header.lower()
     if header.startswith('http_'):
         header = header.replace('http_', '', 1)
     return header.replace('_', '-')
+
+
+# translations of header names and `request.META` keys, shared between
+# requests; the size is limited because clients may send arbitrary headers
+
+_TRANSLATIONS_LIMIT = 1024
+_meta_keys = {}
+_header_names = {}
+
+
+def meta_key(name):
+    """
+    Translates normalized header `name` into `request.META` key
+    """
+
+    try:
+        return _meta_keys[name]
+    except KeyError:
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        if len(_meta_keys) < _TRANSLATIONS_LIMIT:
+            _meta_keys[name] = key
+        return key
+
+
+def header_name(key):
+    """
+    Cached version of `normalize_header_name()`
+    """
+
+    try:
+        return _header_names[key]
+    except KeyError:
+        name = normalize_header_name(key)
+        if len(_header_names) < _TRANSLATIONS_LIMIT:
+            _header_names[key] = name
+        return name
+
+
+class Headers(collections.MutableMapping):
+    """
+    Case-insensitive mapping of HTTP request headers.
+
+    Headers are read directly from the `meta` mapping (`request.META`)
+    and the header name is translated into `HTTP_*` key only when it is
+    looked up. Headers set explicitly override `meta` values.
+
+    Keys are returned as normalized (lowercased, dash-separated) names.
+    `copy()` and `has_key()` are provided for compatibility with plain
+    dicts used before.
+    """
+
+    def __init__(self, meta=None, headers=None):
+        self._meta = meta if meta is not None else {}
+        self._headers = {}
+        self._removed = None
+        if headers:
+            self.update(headers)
+
+    def __getitem__(self, name):
+        name = name.lower()
+        try:
+            return self._headers[name]
+        except KeyError:
+            pass
+        if self._removed and name in self._removed:
+            raise KeyError(name)
+        try:
+            return self._meta[meta_key(name)]
+        except KeyError:
+            raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        name = name.lower()
+        self._headers[name] = value
+        if self._removed:
+            self._removed.discard(name)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        name = name.lower()
+        self._headers.pop(name, None)
+        if self._removed is None:
+            self._removed = set()
+        self._removed.add(name)
+
+    def __iter__(self):
+        for name in self._headers:
+            yield name
+        for key in self._meta:
+            if key.startswith('HTTP_'):
+                name = header_name(key)
+                if name not in self._headers and not (
+                        self._removed and name in self._removed):
+                    yield name
+
+    def __len__(self):
+        return sum(1 for x in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def has_key(self, name):
+        return name in self
+
+    def copy(self):
+        """
+        Returns a plain `dict` of headers, same as `dict.copy()` of
+        headers passed to context before
+        """
+
+        return dict(self.items())
@@ -0,0 +1,82 @@
+"""
+Request stages timing
+
+When an API is created with an `instrumentation` sink, the dispatcher
+measures following stages of every request and sends their timings
+(in seconds) to the sink:
+
+  * `context` - building the request context
+  * `middleware.request` - calling middlewares' `process_request`
+  * `deserialization` - deserializing request body
+  * `negotiation` - content negotiation
+  * `callback` - calling the resource callback (view)
+  * `conversion` - converting data using a representation
+  * `serialization` - serializing converted data
+  * `compression` - compressing response body (if enabled)
+  * `middleware.response` - calling middlewares' `process_response`
+  * `request` - whole request dispatching
+
+Sink is any object implementing `record(context, stage, duration)`.
+Without a sink the stages are not measured at all.
+"""
+
+import logging
+from timeit import default_timer as clock  # NOQA
+
+
+class StageTimer(object):
+    """
+    Sends stage timings of a request `context` to the `sink`
+    """
+
+    __slots__ = ('sink', 'context')
+
+    def __init__(self, sink, context):
+        self.sink = sink
+        self.context = context
+
+    def record(self, stage, started):
+        self.sink.record(self.context, stage, clock() - started)
+
+
+class LoggingSink(object):
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, context, stage, duration):
+        self.logger.log(
+                self.level, '%s %s %s: %.3fms', context.method,
+                context.resource.path, stage, duration * 1000)
+
+
+class StatsdSink(object):
+    """
+    Sends timings to statsd-like `client`, which implements
+    `timing(stat, milliseconds)` method.
+    """
+
+    def __init__(self, client, prefix='restosaur'):
+        self.client = client
+        self.prefix = prefix
+
+    def record(self, context, stage, duration):
+        self.client.timing('%s.%s' % (self.prefix, stage), duration * 1000)
+
+
+class MemorySink(object):
+    """
+    Collects `(resource path, stage, duration)` tuples in `events` list
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def record(self, context, stage, duration):
+        self.events.append((context.resource.path, stage, duration))
+
+    def stages(self):
+        return [event[1] for event in self.events]
+
+    def clear(self):
+        del self.events[:]
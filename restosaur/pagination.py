@@ -0,0 +1,308 @@
+"""
+Cursor-based (keyset) pagination of querysets
+
+    paginator = KeysetPaginator(ordering=('-published', 'pk'), limit=20)
+
+    @article_list.get()
+    def article_list_view(ctx):
+        return paginator.response(ctx, QuerysetFilter(Article.objects.all()))
+
+Pages are selected by filtering on values of the ordering fields
+of the last (or first) row of the previous page, so fetching deep pages
+is as fast as fetching the first one. The cursor is an opaque string
+passed in the `cursor` query parameter. Links to the next and previous
+pages are added to `_links` of the collection response.
+
+The ordering must be unique (should end with the primary key) and
+ordering fields must not be nullable.
+
+Rows are not counted by default. The `count` argument accepts counting
+strategies of collection responses (see `restosaur.counting`), i.e.
+`count='estimate'`, and `count=True` counts all rows using
+`queryset.count()`.
+"""
+
+import base64
+import datetime
+import decimal
+import json
+
+from django.utils.encoding import force_bytes
+
+from .counting import get_count_strategy
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _cursor_default(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif isinstance(obj, decimal.Decimal):
+        return str(obj)
+    return unicode(obj)  # NOQA
+
+
+def encode_cursor(direction, values):
+    data = json.dumps(
+            [direction] + list(values), default=_cursor_default,
+            separators=(',', ':'))
+    return base64.urlsafe_b64encode(force_bytes(data)).rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns `(direction, values)` tuple decoded from the `cursor`
+    """
+
+    try:
+        cursor = str(cursor)
+        data = json.loads(base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)))
+        direction, values = data[0], data[1:]
+    except (TypeError, ValueError, IndexError, KeyError):
+        raise InvalidCursor(cursor)
+
+    if direction not in ('n', 'p'):
+        raise InvalidCursor(cursor)
+
+    return direction, values
+
+
+def ordering_field(model, name):
+    """
+    Returns model field of the ordering lookup `name`, or None if it
+    can't be resolved
+    """
+
+    from django.db.models.fields import FieldDoesNotExist
+
+    opts = model._meta
+    parts = name.split('__')
+
+    for index, part in enumerate(parts):
+        try:
+            field = opts.pk if part == 'pk' else opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if index < len(parts) - 1:
+            rel = getattr(field, 'rel', None)
+            if rel is None:
+                return None
+            opts = rel.to._meta
+
+    return field if hasattr(field, 'to_python') else None
+
+
+def cursor_values(model, ordering, values):
+    """
+    Returns `values` decoded from a cursor converted by `to_python()`
+    of `ordering` fields of the `model`.
+
+    Raises `InvalidCursor` if any value is not valid for its field.
+    """
+
+    from django.core.exceptions import ValidationError
+
+    converted = []
+
+    for name, value in zip(ordering, values):
+        field = ordering_field(model, name.lstrip('-'))
+        if field is not None:
+            try:
+                value = field.to_python(value)
+            except (ValidationError, ValueError, TypeError):
+                raise InvalidCursor(name)
+        converted.append(value)
+
+    return converted
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        field[1:] if field.startswith('-') else '-' + field
+        for field in ordering)
+
+
+def keyset_filter(ordering, values, forward=True):
+    """
+    Returns `Q` object selecting rows placed after (or before,
+    if not `forward`) the row with `values` of `ordering` fields
+    """
+
+    from django.db.models import Q
+
+    query = None
+
+    for index, field in enumerate(ordering):
+        descending = field.startswith('-')
+        lookup = '%s__%s' % (
+                field.lstrip('-'), 'gt' if descending != forward else 'lt')
+        condition = Q(**{lookup: values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            condition &= Q(**{previous.lstrip('-'): value})
+        query = condition if query is None else query | condition
+
+    return query
+
+
+class Page(object):
+    def __init__(self, items, next_cursor=None, prev_cursor=None, count=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class KeysetPaginator(object):
+    def __init__(
+            self, ordering=('pk',), limit=20, max_limit=100, count=False,
+            cursor_param='cursor', limit_param='limit'):
+        self.ordering = tuple(ordering)
+        self.limit = limit
+        self.max_limit = max_limit
+        self.count = count
+        self.cursor_param = cursor_param
+        self.limit_param = limit_param
+
+    def _param(self, ctx, name):
+        value = ctx.parameters.get(name)
+        if isinstance(value, list):
+            value = value[-1]
+        return value
+
+    def get_count_strategy(self):
+        # `True` counts all rows instead of rows of the page
+        count = 'queryset' if self.count is True else self.count
+        return get_count_strategy(count)
+
+    def get_limit(self, ctx):
+        try:
+            limit = int(self._param(ctx, self.limit_param))
+        except (TypeError, ValueError):
+            return self.limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_values(self, obj):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(obj, dict):
+                value = obj[name]
+            else:
+                value = obj
+                for attr in name.split('__'):
+                    value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def paginate(self, ctx, queryset):
+        """
+        Returns a `Page` of `queryset` (or a `QuerysetFilter`, which will
+        be narrowed using context parameters) selected by the cursor
+        and limit passed in context parameters.
+
+        Raises `InvalidCursor` if the cursor can't be decoded, or its
+        values are not valid for the ordering fields.
+        """
+
+        if hasattr(queryset, 'narrow'):
+            queryset = queryset.narrow(ctx.parameters)
+
+        filtered = queryset
+        limit = self.get_limit(ctx)
+        cursor = self._param(ctx, self.cursor_param)
+        forward = True
+
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise InvalidCursor(cursor)
+            forward = direction == 'n'
+            values = cursor_values(queryset.model, self.ordering, values)
+            try:
+                queryset = queryset.filter(
+                        keyset_filter(self.ordering, values, forward))
+            except (ValueError, TypeError):
+                raise InvalidCursor(cursor)
+
+        resource = getattr(ctx, 'resource', None)
+
+        if resource is not None:
+            queryset = resource.project(
+                    ctx, queryset, getattr(ctx, 'representation_name', None),
+                    extra=[field.lstrip('-') for field in self.ordering])
+
+        ordering = self.ordering if forward else reverse_ordering(
+                self.ordering)
+        rows = list(queryset.order_by(*ordering)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_prev = has_more, bool(cursor)
+        else:
+            has_next, has_prev = True, has_more
+
+        next_cursor = prev_cursor = None
+
+        if rows and has_next:
+            next_cursor = encode_cursor('n', self.get_values(rows[-1]))
+        if rows and has_prev:
+            prev_cursor = encode_cursor('p', self.get_values(rows[0]))
+
+        count_strategy = self.get_count_strategy()
+        count = (
+            count_strategy(filtered, len(rows))
+            if count_strategy is not None else None)
+
+        return Page(rows, next_cursor, prev_cursor, count)
+
+    def build_uri(self, ctx, cursor):
+        query = [
+            (key, force_bytes(value))
+            for key, values in ctx.request.GET.lists()
+            if key != self.cursor_param
+            for value in values]
+        query.append((self.cursor_param, cursor))
+        return ctx.resource.uri(ctx, params=ctx.parameters, query=query)
+
+    def get_links(self, ctx, page):
+        links = {}
+        if page.next_cursor:
+            links['next'] = {
+                'uri': self.build_uri(ctx, page.next_cursor),
+                'method': 'GET',
+                }
+        if page.prev_cursor:
+            links['prev'] = {
+                'uri': self.build_uri(ctx, page.prev_cursor),
+                'method': 'GET',
+                }
+        return links
+
+    def response(self, ctx, queryset, **kwargs):
+        """
+        Returns `CollectionResponse` of the current page, or
+        `BadRequestResponse` for an invalid cursor.
+        """
+
+        try:
+            page = self.paginate(ctx, queryset)
+        except InvalidCursor:
+            return ctx.BadRequest({'error': 'Invalid cursor'})
+
+        return ctx.Collection(
+                page.items, totalCount=page.count,
+                count=page.count is not None,
+                links=self.get_links(ctx, page), **kwargs)
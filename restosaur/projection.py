@@ -0,0 +1,131 @@
+"""
+Queryset projection driven by representations
+
+Collection responses ask the representation of items to project
+a queryset before iterating it. `ModelRepresentation` reports lookups
+of its fields, which are used to:
+
+  * load only required columns (`.only()`),
+  * join forward relations (`.select_related()`),
+  * prefetch relations declared in `prefetch_related` attribute,
+  * or fetch row dicts instead of model instances (`.values()`),
+    when the representation sets `use_values = True`.
+
+Columns are not limited when a lookup is not a concrete field
+(i.e. a property), or the queryset was already limited using
+`.only()` / `.defer()` or joined using `.select_related()`.
+Prefetching is not applied to querysets iterated with `.iterator()`,
+i.e. by streamed collection responses.
+
+Projection relies on the model `_meta` API of Django 1.8+. With older
+versions of Django querysets are returned unprojected.
+"""
+
+
+def lookup_from_path(path):
+    return path.replace('.', '__')
+
+
+def supports_projection(model):
+    """
+    Returns True if `_meta` of the `model` provides the field API
+    (`is_relation`, `related_model`, ...) introduced in Django 1.8.
+    """
+
+    return hasattr(model._meta, 'get_fields')
+
+
+def analyze_lookup(model, lookup):
+    """
+    Returns `(relations, field)` tuple for `lookup` of the `model`, where
+    `relations` is a list of `(lookup, to_many)` pairs of traversed
+    relations, and `field` is a name of the concrete field to load,
+    or None if the lookup can't be loaded using `.only()`.
+    """
+
+    from django.db.models.fields import FieldDoesNotExist
+
+    opts = model._meta
+    parts = lookup.split('__')
+    relations = []
+
+    for index, name in enumerate(parts):
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            return relations, None
+
+        path = '__'.join(parts[:index] + [field.name])
+        to_many = bool(field.many_to_many or field.one_to_many)
+
+        if name != field.name and name == getattr(field, 'attname', None):
+            # foreign key column (i.e. `author_id`) is a local field
+            return relations, path
+
+        if field.is_relation:
+            relations.append((path, to_many))
+            if to_many:
+                return relations, None
+            opts = field.related_model._meta
+        elif index < len(parts) - 1:
+            return relations, None
+
+    if not field.concrete:
+        return relations, None
+
+    return relations, path
+
+
+def project_queryset(
+        queryset, lookups, select_related=(), prefetch_related=(),
+        values=False, complete=True):
+    """
+    Returns `queryset` projected to `lookups`.
+
+    Columns are limited only when the `lookups` are `complete` (no other
+    attributes of objects are accessed). With `values` enabled,
+    the queryset returns row dicts with `lookups` as keys.
+    """
+
+    if getattr(queryset, '_fields', None) is not None:
+        # already a `.values()` queryset
+        return queryset
+
+    if not supports_projection(queryset.model):
+        return queryset
+
+    # deferring fields of relations joined by the caller is not safe
+    complete = complete and queryset.query.select_related is False
+
+    only = []
+    selected = list(select_related)
+    prefetched = list(prefetch_related)
+
+    for lookup in lookups:
+        relations, field = analyze_lookup(queryset.model, lookup)
+        for path, to_many in relations:
+            if to_many:
+                if path not in prefetched:
+                    prefetched.append(path)
+            elif path not in selected:
+                selected.append(path)
+                only.append(path)
+        if field is None:
+            complete = False
+        elif field not in only:
+            only.append(field)
+
+    if values and complete and not prefetched:
+        return queryset.values(*lookups)
+
+    if selected:
+        queryset = queryset.select_related(*selected)
+    if prefetched:
+        queryset = queryset.prefetch_related(*prefetched)
+
+    deferred, defer = queryset.query.deferred_loading
+
+    if complete and only and not deferred and defer:
+        queryset = queryset.only(*only)
+
+    return queryset
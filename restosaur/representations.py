@@ -1,4 +1,72 @@
-from .forms import modelform_factory, model_to_dict
+"""
+Representations with sparse fieldsets support
+
+Clients may limit fields of a representation using `fields` query
+parameter (i.e. `?fields=id,title`). Output of any representation
+factory is then narrowed to the requested fields, but all fields are
+still computed.
+
+`FieldsRepresentation` declares how every field is computed, so fields
+which are not requested are not computed at all:
+
+    article_repr = FieldsRepresentation(
+        id=lambda article, ctx: article.pk,
+        title=lambda article, ctx: article.title,
+        comments=lambda article, ctx: article.comments.count())
+
+    article.representation()(article_repr)
+
+`ModelRepresentation` subclasses declare fields of model instances,
+which are compiled once, at class creation, into attribute getters:
+
+    class ArticleRepresentation(ModelRepresentation):
+        fields = (
+            'id', 'title', ('author', 'author.name'),
+            ('comments', lambda article, ctx: article.comments.count()))
+
+    article.representation()(ArticleRepresentation())
+
+Querysets of collection responses converted by `ModelRepresentation`
+are limited to columns and relations of requested fields
+(see `restosaur.projection`).
+
+The name of the query parameter may be changed by
+`RESTOSAUR_FIELDS_PARAMETER` setting.
+"""
+
+import operator
+from collections import OrderedDict
+from itertools import izip
+
+from .forms import modelform_factory
+from .projection import lookup_from_path, project_queryset
+from .utils import LRUCache
+
+
+def parse_fields(values):
+    """
+    Returns a frozenset of field names from a list of comma-separated
+    `values`, or None if no field was requested
+    """
+
+    fields = frozenset(
+        name.strip() for value in values for name in value.split(',')
+        if name.strip())
+    return fields or None
+
+
+def select_fields(data, fields):
+    """
+    Returns a copy of `data` dict limited to `fields`, keeping order
+    of an `OrderedDict`. Other objects are returned as is.
+    """
+
+    if fields is None or not isinstance(data, dict):
+        return data
+    if isinstance(data, OrderedDict):
+        return OrderedDict(
+            (key, value) for key, value in data.items() if key in fields)
+    return dict((key, data[key]) for key in fields if key in data)
 
 
 class Representation(object):
@@ -16,15 +84,297 @@ class Representation(object):
         return data
 
 
+class FieldsRepresentation(object):
+    """
+    Representation factory built from field getters, which are
+    callables accepting an object and a context. Getters of fields
+    not requested by `context.fields` are not called.
+    """
+
+    # output is already limited to requested fields
+    sparse = True
+
+    def __init__(self, fields=None, **getters):
+        self.fields = OrderedDict(fields or ())
+        self.fields.update(sorted(getters.items()))
+        self._selected = LRUCache(32)
+
+    def get_fields(self, context):
+        """
+        Returns a tuple of `(name, getter)` pairs of fields requested
+        within the `context`
+        """
+
+        requested = getattr(context, 'fields', None)
+
+        if requested is None:
+            return tuple(self.fields.items())
+
+        selected = self._selected.get(requested)
+
+        if selected is None:
+            selected = tuple(
+                (name, getter) for name, getter in self.fields.items()
+                if name in requested)
+            self._selected.set(requested, selected)
+
+        return selected
+
+    def __call__(self, obj, context):
+        return dict(
+            (name, getter(obj, context))
+            for name, getter in self.get_fields(context))
+
+
+ALL_FIELDS = '__all__'
+
+
+def many_to_many_getter(name):
+    def getter(obj, context):
+        if obj.pk is None:
+            return []
+        return [item.pk for item in getattr(obj, name).all()]
+    return getter
+
+
+def model_fields(model):
+    """
+    Returns `(key, source)` pairs of editable fields of the `model`,
+    same as converted by Django's `forms.model_to_dict()`: foreign keys
+    are converted to primary keys, and many-to-many fields to lists
+    of primary keys.
+    """
+
+    opts = model._meta
+    fields = [
+        (field.name, field.attname) for field in opts.concrete_fields
+        if field.editable]
+    fields.extend(
+        (field.name, many_to_many_getter(field.name))
+        for field in opts.many_to_many if field.editable)
+    return tuple(fields)
+
+
+def normalize_fields(fields):
+    """
+    Returns a tuple of `(key, source)` pairs from field declarations,
+    which are attribute paths (`'title'`, `'author.name'`) or `(key,
+    source)` tuples, where source is an attribute path or a callable
+    accepting an object and a context.
+    """
+
+    result = []
+    for field in fields:
+        if isinstance(field, basestring):  # NOQA
+            result.append((field, field))
+        else:
+            key, source = field
+            result.append((key, source))
+    return tuple(result)
+
+
+def safe_attrgetter(path):
+    """
+    Returns a getter of dotted attribute `path`, which returns None
+    when any of intermediate values is None
+    """
+
+    names = path.split('.')
+
+    def getter(obj):
+        for name in names:
+            if obj is None:
+                return None
+            obj = getattr(obj, name)
+        return obj
+    return getter
+
+
+def _tuple_getter(getter_class, keys):
+    if len(keys) > 1:
+        return getter_class(*keys)
+    elif keys:
+        # single key getter does not return a tuple
+        getter = getter_class(keys[0])
+        return lambda obj: (getter(obj),)
+    return lambda obj: ()
+
+
+class CompiledFields(object):
+    """
+    Converts objects into dicts using one `operator.attrgetter()` for
+    all attribute fields, followed by calls of computed fields.
+
+    When the getter fails (i.e. a dotted path traverses a nullable
+    relation), attributes are read one by one and paths traversing None
+    values are converted to None.
+
+    Row dicts of `.values()` querysets are converted using
+    `operator.itemgetter()` of attribute paths translated to lookups.
+    """
+
+    __slots__ = (
+        'keys', 'paths', 'getter', 'safe_getters', 'row_getter', 'computed')
+
+    def __init__(self, fields):
+        attributes = [(key, src) for key, src in fields if not callable(src)]
+        self.keys = tuple(key for key, src in attributes)
+        self.paths = tuple(src for key, src in attributes)
+        self.computed = tuple(
+            (key, src) for key, src in fields if callable(src))
+        self.getter = _tuple_getter(operator.attrgetter, self.paths)
+        self.safe_getters = tuple(
+            safe_attrgetter(path) for path in self.paths)
+        self.row_getter = _tuple_getter(
+                operator.itemgetter,
+                [lookup_from_path(path) for path in self.paths])
+
+    def to_dict(self, obj, context):
+        if type(obj) is dict:
+            values = self.row_getter(obj)
+        else:
+            try:
+                values = self.getter(obj)
+            except AttributeError:
+                values = [getter(obj) for getter in self.safe_getters]
+        data = dict(izip(self.keys, values))
+        for key, func in self.computed:
+            data[key] = func(obj, context)
+        return data
+
+
+class ModelRepresentationMeta(type):
+    def __new__(mcs, name, bases, attrs):
+        cls = super(ModelRepresentationMeta, mcs).__new__(
+                mcs, name, bases, attrs)
+        if (isinstance(cls.fields, basestring) and  # NOQA
+                cls.fields != ALL_FIELDS):
+            raise TypeError(
+                    '%s.fields must be a sequence of fields or %r, got %r' % (
+                        name, ALL_FIELDS, cls.fields))
+        cls.declared_fields = cls.get_declared_fields()
+        cls.compiled_fields = CompiledFields(cls.declared_fields)
+        cls._selected = LRUCache(32)
+        return cls
+
+
 class ModelRepresentation(Representation):
+    """
+    Declarative representation of objects.
+
+    Fields are declared as a tuple of attribute paths, `(key, path)` or
+    `(key, callable)` pairs in `fields` attribute. With `fields` set
+    to `'__all__'` (default), editable fields of the `model` are used,
+    same as by Django's `forms.model_to_dict()`.
+
+    Dotted attribute paths traversing None values are converted to None.
+
+    Instances may be registered as representation factories, or created
+    with a context and used as `to_dict(obj)`.
+
+    Querysets of collection responses are projected to the declared
+    fields (see `project()`). Lookups of model fields used by computed
+    fields should be declared in `requires`, otherwise all columns are
+    loaded. When `use_values` is enabled, rows are fetched as dicts
+    using `.values()`, and computed fields are called with these dicts.
+    """
+
+    __metaclass__ = ModelRepresentationMeta
+
     model = None
     form = None
-    fields = '__all__'
+    fields = ALL_FIELDS
+
+    select_related = ()
+    prefetch_related = ()
+    requires = None
+    use_values = False
+
+    # output is already limited to requested fields
+    sparse = True
+
+    def __init__(self, context=None):
+        super(ModelRepresentation, self).__init__(context)
+
+    @classmethod
+    def get_declared_fields(cls):
+        if cls.fields is not None and cls.fields != ALL_FIELDS:
+            return normalize_fields(cls.fields)
+        if cls.model is not None:
+            return model_fields(cls.model)
+        return ()
 
     def get_form(self):
         if self.form:
             return self.form
-        return modelform_factory(self.model, fields=self.fields)
+        if self.fields is None or self.fields == ALL_FIELDS:
+            fields = ALL_FIELDS
+        else:
+            opts = self.model._meta
+            names = set(
+                field.name
+                for field in list(opts.fields) + list(opts.many_to_many))
+            fields = [
+                source for key, source in self.declared_fields
+                if source in names]
+        return modelform_factory(self.model, fields=fields)
 
-    def to_dict(self, obj):
-        return model_to_dict(obj)
+    def get_compiled_fields(self, context):
+        """
+        Returns `CompiledFields` of fields requested within the `context`
+        """
+
+        requested = getattr(context, 'fields', None)
+
+        if requested is None:
+            return self.compiled_fields
+
+        compiled = self._selected.get(requested)
+
+        if compiled is None:
+            compiled = CompiledFields([
+                (key, source) for key, source in self.declared_fields
+                if key in requested])
+            self._selected.set(requested, compiled)
+
+        return compiled
+
+    def get_lookups(self, context):
+        """
+        Returns `(lookups, complete)` tuple, where `lookups` is a list
+        of queryset lookups of fields requested within the `context`,
+        and `complete` tells whether no other attributes are accessed
+        """
+
+        compiled = self.get_compiled_fields(context)
+        lookups = [lookup_from_path(path) for path in compiled.paths]
+
+        if not compiled.computed:
+            return lookups, True
+        if self.requires is None:
+            return lookups, False
+
+        lookups.extend(
+            lookup for lookup in self.requires if lookup not in lookups)
+        return lookups, True
+
+    def project(self, queryset, context, extra=()):
+        """
+        Returns `queryset` limited to columns and relations of fields
+        requested within the `context`, and `extra` lookups
+        """
+
+        lookups, complete = self.get_lookups(context)
+        lookups.extend(lookup for lookup in extra if lookup not in lookups)
+        return project_queryset(
+                queryset, lookups, select_related=self.select_related,
+                prefetch_related=self.prefetch_related,
+                values=self.use_values, complete=complete)
+
+    def to_dict(self, obj, context=None):
+        if context is None:
+            context = self.context
+        return self.get_compiled_fields(context).to_dict(obj, context)
+
+    def __call__(self, obj, context):
+        return self.to_dict(obj, context)
@@ -1,3 +1,4 @@
+import collections
 import functools
 import logging
 import sys
@@ -8,44 +9,87 @@ from collections import OrderedDict
 
 import mimeparse
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
 import responses
 import urltemplate
 
 from .exceptions import Http404
-from .headers import (build_content_type_header, normalize_header_name,
-                      parse_accept_header)
+from .headers import build_content_type_header, parse_accept_header
+from .instrumentation import clock
 from .loading import load_resource
+from .representations import select_fields
 from .serializers import default_serializers
+from .utils import LRUCache
 
 log = logging.getLogger(__name__)
 
 
 DEFAULT_REPRESENTATION_KEY = '__default__'
 
+SAFE_METHODS = ('GET', 'HEAD')
+
+_missing = object()
+
 
 def http_response(response):
     """
     RESTResponse -> HTTPResponse factory
+
+    Streaming responses are written using `StreamingHttpResponse`
+    when the negotiated serializer supports `dumps_iter()`.
+
+    Bodies are compressed when the API has a `compression` policy.
+
+    Successful responses with a `version` key or `etag` enabled get
+    the ETag header. GET and HEAD requests with a matching
+    `If-None-Match` header are answered with 304 Not Modified without
+    a body. For a `version` key the data is not serialized at all.
     """
 
-    if isinstance(response, HttpResponse):
+    if isinstance(response, (HttpResponse, StreamingHttpResponse)):
         return response
 
     context = response.context
+    timer = context.timer
+    etag = None
 
     if response.data is not None:
         content_type = context.response_content_type
         serializer = context.serializer
         representation = context.representation_name
-        content = serializer.dumps(
-                response.serialize(response.data, representation))
+        conditional = (
+                200 <= response.status < 300 and
+                context.method in SAFE_METHODS)
+
+        if response.version is not None and 200 <= response.status < 300:
+            etag = response.build_etag()
+            if conditional and context.etag_matches(etag):
+                return not_modified_response(response, etag)
+
+        if response.streaming and hasattr(serializer, 'dumps_iter'):
+            httpresp = StreamingHttpResponse(
+                    response.serialize_iter(serializer, representation),
+                    status=response.status)
+        else:
+            if timer:
+                started = clock()
+            data = response.serialize(response.data, representation)
+            if timer:
+                timer.record('conversion', started)
+                started = clock()
+            content = serializer.dumps(data)
+            if timer:
+                timer.record('serialization', started)
+            if (etag is None and response.etag and
+                    200 <= response.status < 300):
+                etag = response.build_etag(content)
+                if conditional and context.etag_matches(etag):
+                    return not_modified_response(response, etag)
+            httpresp = HttpResponse(content, status=response.status)
     else:
-        content = ''
         content_type = 'application/json'
-
-    httpresp = HttpResponse(content, status=response.status)
+        httpresp = HttpResponse('', status=response.status)
 
     if content_type:
         httpresp['Content-Type'] = content_type
@@ -53,22 +97,54 @@ def http_response(response):
     for header, value in response.headers.items():
         httpresp[header] = value
 
+    if etag:
+        httpresp['ETag'] = etag
+
+    compression = getattr(context.api, 'compression', None)
+
+    if compression is not None:
+        if timer:
+            started = clock()
+        httpresp = compression.compress_response(context, httpresp)
+        if timer:
+            timer.record('compression', started)
+
     return httpresp
 
 
+def not_modified_response(response, etag):
+    headers = dict(response.headers)
+    headers['ETag'] = etag
+    return http_response(response.context.NotModified(headers=headers))
+
+
+def negotiation_cache_size():
+    from .settings import NEGOTIATION_CACHE_SIZE
+    return NEGOTIATION_CACHE_SIZE
+
+
 def resource_name_from_path(path):
     return urltemplate.remove_parameters(path).strip('/')
 
 
 class Resource(object):
-    def __init__(self, path, name=None, expose=False, serializers=None):
+    def __init__(
+            self, path, name=None, expose=False, serializers=None,
+            cache=None):
         self._path = path
+        self._urltemplate = urltemplate.compile_template(path)
         self._callbacks = {}
+        self._streamed_bodies = set()
         self._expose = expose
         self._links = {}
+        self._links_cache = LRUCache(16)
         self._name = name or resource_name_from_path(path)
         self._representations = OrderedDict()
+        self._batch_representations = OrderedDict()
         self._serializers = serializers or default_serializers
+        self._serializers_version = self._serializers.version
+        self._cache = cache
+        self._negotiation_cache = LRUCache(negotiation_cache_size())
 
         if expose:
             warnings.warn(
@@ -86,11 +162,21 @@ class Resource(object):
                     self, verb.lower(),
                     functools.partial(self._decorator, verb))
 
-    def _decorator(self, method, link_to=None, link_as=None):
+    def _decorator(self, method, link_to=None, link_as=None, stream=False):
+        """
+        Registers a callback for the `method`.
+
+        With `stream=True` the request body is deserialized incrementally
+        (if the serializer supports `loads_iter()`), and `ctx.body` is
+        a generator of top-level array items.
+        """
+
         def wrapper(view):
             if method in self._callbacks:
                 raise ValueError('Already registered')
             self._callbacks[method] = view
+            if stream:
+                self._streamed_bodies.add(method)
             if link_to:
                 if isinstance(link_to, types.StringTypes):
                     link_resource = load_resource(link_to)
@@ -98,6 +184,7 @@ class Resource(object):
                     link_resource = link_to
                 key = link_as or link_resource.__name__
                 link_resource._links[key] = (method, self)
+                link_resource._links_cache.clear()
             return view
         return wrapper
 
@@ -121,11 +208,79 @@ class Resource(object):
     def representations(self):
         return self._representations
 
+    @property
+    def batch_representations(self):
+        return self._batch_representations
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def negotiation_cache(self):
+        return self._negotiation_cache
+
+    def negotiate(self, accept):
+        """
+        Returns `(content_type, serializer, representation_name)` triple
+        matching raw `Accept` header value, or None if the requested
+        content type is not acceptable.
+
+        Results are memoized per resource and invalidated when
+        representations or serializers registry change.
+        """
+
+        if self._serializers_version != self._serializers.version:
+            self._negotiation_cache.clear()
+            self._serializers_version = self._serializers.version
+
+        result = self._negotiation_cache.get(accept, _missing)
+        if result is _missing:
+            result = self._negotiate(accept)
+            self._negotiation_cache.set(accept, result)
+        return result
+
+    def _negotiate(self, accept):
+        if accept is None:
+            content_type = 'application/json'
+            return (
+                content_type, self._serializers[content_type],
+                DEFAULT_REPRESENTATION_KEY)
+
+        response_serializer = None
+        response_representation = None
+
+        try:
+            accepting = parse_accept_header(accept)
+        except ValueError:
+            content_type = None
+        else:
+            for content_type, representation, q in accepting:
+                if content_type == '*/*' or content_type == 'application/*':  # NOQA
+                    content_type = 'application/json'
+                    response_representation = DEFAULT_REPRESENTATION_KEY
+                if self._serializers.contains(content_type)\
+                        and (not representation or self.has_representation(representation)):  # NOQA
+                    response_representation = representation or DEFAULT_REPRESENTATION_KEY  # NOQA
+                    response_serializer = self._serializers[content_type]  # NOQA
+                    content_type = build_content_type_header(
+                            content_type, representation)
+                    break
+
+            if content_type and not response_serializer:
+                try:
+                    response_serializer = self._serializers[content_type]  # NOQA
+                except KeyError:
+                    return None
+
+        return (content_type, response_serializer, response_representation)
+
     def __call__(self, ctx, *args, **kw):
         from django.http import Http404 as DjangoHttp404
 
         method = ctx.method
         request = ctx.request
+        timer = ctx.timer
 
         try:
             content_length = int(request.META['CONTENT_LENGTH'])
@@ -137,9 +292,17 @@ class Resource(object):
                     dict(self._serializers.items()),
                     request.META['CONTENT_TYPE'])
             if mimetype:
-                ctx.deserializer = self._serializers[mimetype]
-                if request.body:
-                    ctx.body = self._serializers[mimetype].loads(ctx)
+                ctx.deserializer = deserializer = self._serializers[mimetype]
+                if method in self._streamed_bodies and hasattr(
+                        deserializer, 'loads_iter'):
+                    # parsed by the callback while consuming items
+                    ctx.body = deserializer.loads_iter(ctx)
+                elif request.body:
+                    if timer:
+                        started = clock()
+                    ctx.body = deserializer.loads(ctx)
+                    if timer:
+                        timer.record('deserialization', started)
             elif not content_length:
                 self.body = None
             else:
@@ -147,50 +310,21 @@ class Resource(object):
 
         ctx.content_type = request.META.get('CONTENT_TYPE')
 
-        # prepare request headers
-
-        headers = request.META.items()
-        http_headers = dict(map(
-            lambda x: (normalize_header_name(x[0]), x[1]),
-            filter(lambda x: x[0].startswith('HTTP_'), headers)))
-        ctx.headers.update(http_headers)
-
         # match response representation, serializer and content type
 
-        response_content_type = None
-        response_serializer = None
-        response_representation = None
+        if timer:
+            started = clock()
 
-        if 'accept' in ctx.headers:
-            try:
-                accepting = parse_accept_header(ctx.headers['accept'])
-            except ValueError:
-                content_type = None
-            else:
-                for content_type, representation, q in accepting:
-                    if content_type == '*/*' or content_type == 'application/*':  # NOQA
-                        content_type = 'application/json'
-                        response_representation = DEFAULT_REPRESENTATION_KEY
-                    if ctx.resource.serializers.contains(content_type)\
-                            and (not representation or representation in ctx.resource.representations):  # NOQA
-                        response_representation = representation or DEFAULT_REPRESENTATION_KEY  # NOQA
-                        response_serializer = ctx.resource.serializers[content_type]  # NOQA
-                        content_type = build_content_type_header(
-                                content_type, representation)
-                        break
-
-                if content_type and not response_serializer:
-                    try:
-                        response_serializer = ctx.resource.serializers[content_type]  # NOQA
-                    except KeyError:
-                        return http_response(ctx.NotAcceptable())
+        negotiated = self.negotiate(ctx.headers.get('accept'))
 
-        else:
-            content_type = 'application/json'
-            response_serializer = ctx.resource.serializers[content_type]
-            response_representation = DEFAULT_REPRESENTATION_KEY
+        if timer:
+            timer.record('negotiation', started)
+
+        if negotiated is None:
+            return http_response(ctx.NotAcceptable())
 
-        response_content_type = content_type
+        (response_content_type, response_serializer,
+            response_representation) = negotiated
 
         if content_length and (
                 not response_content_type or not response_serializer):
@@ -203,16 +337,30 @@ class Resource(object):
         ctx.serializer = response_serializer
 
         # support for X-HTTP-METHOD-OVERRIDE
-        method = http_headers.get('x-http-method-override') or method
+        method = ctx.headers.get('x-http-method-override') or method
+
+        cache = self._cache
+        cache_key = None
+
+        if (cache is not None and method in SAFE_METHODS and
+                method in self._callbacks):
+            cache_key = cache.get_cache_key(ctx, method)
+            httpresp = cache.get_response(ctx, cache_key)
+            if httpresp is not None:
+                return httpresp
 
         log.debug('Calling %s, %s, %s' % (method, args, kw))
         if method in self._callbacks:
             try:
+                if timer:
+                    started = clock()
                 try:
                     resp = self._callbacks[method](ctx, *args, **kw)
                 except DjangoHttp404:
                     raise Http404
                 else:
+                    if timer:
+                        timer.record('callback', started)
                     if not resp:
                         raise TypeError(
                                 'Method `%s` does not return '
@@ -220,7 +368,14 @@ class Resource(object):
                     if not response_representation and resp.data is not None:
                         return http_response(ctx.NotAcceptable())
 
-                    return http_response(resp)
+                    httpresp = http_response(resp)
+
+                    if cache_key:
+                        cache.set_response(cache_key, httpresp)
+                    elif cache is not None and 200 <= httpresp.status_code < 300:  # NOQA
+                        cache.invalidate(self)
+
+                    return httpresp
             except Http404:
                 return http_response(ctx.NotFound())
             except Exception as ex:
@@ -243,38 +398,149 @@ class Resource(object):
                 'error': 'Method `%s` is not registered for resource `%s`' % (
                     method, self._path)}))
 
-    def representation(self, name=DEFAULT_REPRESENTATION_KEY):
+    def representation(self, name=DEFAULT_REPRESENTATION_KEY, batch=False):
+        """
+        Registers representation factory under the `name`.
+
+        Batch factories (`batch=True`) are called with a whole iterable
+        of objects and a context, and must return a list of converted
+        objects. They are used by collection responses, which allows
+        to fetch related data for all objects at once.
+        """
+
         def wrapped(func):
-            self._representations[name] = func
+            if batch:
+                self._batch_representations[name] = func
+            else:
+                self._representations[name] = func
+            self._negotiation_cache.clear()
             return func
         return wrapped
 
+    def has_representation(self, name):
+        return (
+            name in self._representations or
+            name in self._batch_representations)
+
     def uri(self, context, params=None, query=None):
         assert params is None or isinstance(
-                params, dict), "entity.uri() params should be passed as dict"
+                params, collections.Mapping), \
+            "entity.uri() params should be passed as dict"
 
         params = params or {}
 
-        uri = context.build_absolute_uri(self._path)
-        uri = urltemplate.to_url(uri, params)
+        uri = context.build_absolute_uri(self._urltemplate.expand(params))
 
         if query:
             uri += '?'+urllib.urlencode(query)
 
         return uri
 
-    def convert(self, context, obj, representation=None):
+    def get_links(self, context):
         """
-        Converts model (`obj`) using specified or default `representation`
-        within a `context`
+        Returns links of the resource as a dict of
+        `{name: {'uri': uri, 'method': method}}`.
+
+        Links to resources without URI parameters are memoized per
+        request host and API.
         """
 
-        if (representation is None or
-                representation == DEFAULT_REPRESENTATION_KEY):
+        key = (context.base_uri, context.api.path)
+        static_links = self._links_cache.get(key)
+
+        if static_links is None:
+            static_links = {}
+            for name, (method, linked_resource) in self._links.items():
+                if not linked_resource._urltemplate.names:
+                    static_links[name] = {
+                        'uri': linked_resource.uri(context),
+                        'method': method.upper(),
+                        }
+            self._links_cache.set(key, static_links)
+
+        links = {}
+
+        for name, (method, linked_resource) in self._links.items():
             try:
-                convert = self.representations[DEFAULT_REPRESENTATION_KEY]
+                links[name] = dict(static_links[name])
             except KeyError:
-                convert = responses.dummy_converter
-        else:
-            convert = self.representations[representation]
-        return convert(obj, context)
+                links[name] = {
+                    'uri': linked_resource.uri(
+                        context, params=context.parameters),
+                    'method': method.upper(),
+                    }
+
+        return links
+
+    def convert(self, context, obj, representation=None):
+        """
+        Converts model (`obj`) using specified or default `representation`
+        within a `context`.
+
+        The result is limited to fields requested within the `context`.
+        """
+
+        name = representation or DEFAULT_REPRESENTATION_KEY
+
+        try:
+            convert = self._representations[name]
+        except KeyError:
+            if name in self._batch_representations:
+                return self.convert_many(context, [obj], representation)[0]
+            if name != DEFAULT_REPRESENTATION_KEY:
+                raise
+            convert = responses.dummy_converter
+
+        fields = getattr(context, 'fields', None)
+
+        if fields is None or getattr(convert, 'sparse', False):
+            return convert(obj, context)
+        return select_fields(convert(obj, context), fields)
+
+    def project(self, context, iterable, representation=None, extra=()):
+        """
+        Returns `iterable` queryset projected by specified or default
+        `representation` within a `context` (see `restosaur.projection`).
+
+        Other iterables and querysets converted by representations
+        which do not support projection are returned as is.
+        """
+
+        if getattr(iterable, 'query', None) is None:
+            return iterable
+
+        name = representation or DEFAULT_REPRESENTATION_KEY
+        convert = (
+            self._representations.get(name) or
+            self._batch_representations.get(name))
+        project = getattr(convert, 'project', None)
+
+        if project is None:
+            return iterable
+        return project(iterable, context, extra)
+
+    def get_batch_converter(self, representation=None):
+        return self._batch_representations.get(
+                representation or DEFAULT_REPRESENTATION_KEY)
+
+    def convert_many(self, context, iterable, representation=None):
+        """
+        Converts objects from `iterable` using specified or default
+        `representation` within a `context`, and returns a list.
+
+        Batch representation is used when it is registered.
+        """
+
+        convert = self.get_batch_converter(representation)
+
+        if convert is None:
+            return [
+                self.convert(context, obj, representation)
+                for obj in iterable]
+
+        fields = getattr(context, 'fields', None)
+        items = list(convert(iterable, context))
+
+        if fields is None or getattr(convert, 'sparse', False):
+            return items
+        return [select_fields(item, fields) for item in items]
@@ -1,16 +1,24 @@
+import hashlib
+import itertools
+
 import times
+from django.utils.encoding import force_bytes
 from django.utils.http import http_date
 
+from .counting import get_count_strategy
+
 
 def dummy_converter(x, context):
     return x
 
 
 class Response(object):
+    streaming = False
+
     def __init__(
             self, context, data=None, status=200, headers=None,
             last_modified=None, extra=None, add_links=True,
-            links_key='_links'):
+            links_key='_links', etag=False, version=None, weak_etag=False):
         self.headers = {}
         self.headers.update(headers or {})
         self.representation = None
@@ -21,6 +29,9 @@ class Response(object):
         self.links_key = links_key
         self.add_links = add_links
         self.data = data
+        self.etag = etag
+        self.version = version
+        self.weak_etag = weak_etag
         if last_modified:
             self.set_last_modified(last_modified)
 
@@ -34,6 +45,23 @@ class Response(object):
         else:
             self.headers.pop('Last-Modified', None)
 
+    def build_etag(self, content=None):
+        """
+        Returns ETag header value computed from the `version` key,
+        the response content type and requested fields, or from
+        serialized `content` if no version key was provided.
+        """
+
+        if self.version is not None:
+            value = u'%s:%s' % (
+                    self.version, self.context.response_content_type)
+            if self.context.fields is not None:
+                value += u':' + u','.join(sorted(self.context.fields))
+        else:
+            value = content
+        etag = '"%s"' % hashlib.md5(force_bytes(value)).hexdigest()
+        return 'W/' + etag if self.weak_etag else etag
+
     def serialize(self, data, representation):
         if data is None and not self.extra:
             return ''
@@ -49,16 +77,9 @@ class Response(object):
             return output
 
     def _serialize_links(self, data, representation):
-        links = {}
         if self.add_links and self.context.resource._links:
-            for key in self.context.resource._links:
-                method, linked_resource = self.context.resource._links[key]
-                links[key] = {
-                    'uri': linked_resource.uri(
-                        self.context, params=self.context.parameters),
-                    'method': method.upper(),
-                    }
-        return links
+            return self.context.resource.get_links(self.context)
+        return {}
 
     def _add_links(self, resp, data, representation):
         if self.links_key not in resp:
@@ -125,24 +146,99 @@ class MethodNotAllowedResponse(Response):
 
 
 class CollectionResponse(Response):
-    def __init__(self, context, iterable, totalCount=None, key=None, **kwargs):
+    batch_size = 500
+
+    def __init__(
+            self, context, iterable, totalCount=None, key=None,
+            stream=False, count=True, links=None, **kwargs):
         super(CollectionResponse, self).__init__(
                 context, data=iterable, **kwargs)
         self.key = key or 'items'
         self.totalCount = totalCount
+        self.count_strategy = get_count_strategy(count)
+        self.links = links
+        self.streaming = stream
+
+    def _add_links(self, resp, data, representation):
+        super(CollectionResponse, self)._add_links(resp, data, representation)
+        if self.links:
+            resp[self.links_key].update(self.links)
+        return resp
+
+    def get_total_count(self, iterable, length):
+        """
+        Returns `totalCount` value, or None if the collection
+        should not be counted
+        """
+
+        if self.count_strategy is None:
+            return None
+        if self.totalCount is not None:
+            return self.totalCount
+        return self.count_strategy(iterable, length)
 
     def serialize(self, iterable, representation):
-        resp = {
-                self.key: map(lambda x: self.context.resource.convert(
-                    self.context, x, representation), iterable),
-                'totalCount': (
-                    self.totalCount if self.totalCount is not None
-                    else len(iterable)),
-                }
+        resource = self.context.resource
+        items = resource.convert_many(
+                self.context,
+                resource.project(self.context, iterable, representation),
+                representation)
+        resp = {self.key: items}
+        total_count = self.get_total_count(iterable, len(items))
+        if total_count is not None:
+            resp['totalCount'] = total_count
         resp.update(self.extra or {})
         self._add_links(resp, iterable, representation)
         return resp
 
+    def serialize_iter(self, serializer, representation):
+        """
+        Returns an iterator of serialized chunks.
+
+        Items are fetched lazily (using `.iterator()` for querysets)
+        and converted one by one (or in batches of `batch_size` objects
+        when batch representation is registered), so the whole collection
+        is never held in memory. `totalCount` and links are written after
+        the items.
+        """
+
+        iterable = self.data
+        resource = self.context.resource
+        counter = {'count': 0}
+        projected = resource.project(self.context, iterable, representation)
+
+        try:
+            objects = projected.iterator()
+        except AttributeError:
+            objects = iter(projected)
+
+        def items():
+            if resource.get_batch_converter(representation):
+                while True:
+                    batch = list(itertools.islice(objects, self.batch_size))
+                    if not batch:
+                        break
+                    counter['count'] += len(batch)
+                    for item in resource.convert_many(
+                            self.context, batch, representation):
+                        yield item
+            else:
+                for obj in objects:
+                    counter['count'] += 1
+                    yield resource.convert(self.context, obj, representation)
+
+        def tail():
+            resp = {}
+            total_count = self.get_total_count(iterable, counter['count'])
+            if total_count is not None:
+                resp['totalCount'] = total_count
+            resp.update(self.extra or {})
+            resp.pop(self.key, None)
+            self._add_links(resp, iterable, representation)
+            return resp
+
+        return serializer.dumps_iter(self.key, items(), tail)
+
 
 class EntityResponse(Response):
     pass
@@ -0,0 +1,125 @@
+"""
+Resolving resource paths using a segment trie
+
+    api = API('api', single_route=True)
+
+An API created with `single_route=True` registers one catch-all URL
+pattern under its prefix and resolves resources by walking a trie
+of path segments, instead of trying a regex of every resource.
+Lookup cost depends on the path depth, not on the number of resources.
+
+Literal segments are matched before `:param` segments, so `items/new`
+is resolved before `items/:pk` regardless of registration order.
+Parameters must fill whole segments; other templates (i.e.
+`items/:pk.json`) are matched by a regex after the trie lookup fails.
+"""
+
+import re
+
+from .urltemplate import compile_template
+
+
+class Node(object):
+    __slots__ = ('children', 'param', 'target')
+
+    def __init__(self):
+        self.children = {}
+        self.param = None
+        self.target = None
+
+
+def split_template(template):
+    """
+    Returns a list of segments of the compiled URL `template`, where
+    parameter segments are None, or None if a parameter does not fill
+    a whole segment.
+    """
+
+    segments = template.literals[0].split('/')
+
+    for literal in template.literals[1:]:
+        if literal and not literal.startswith('/'):
+            return None
+        segments.append(None)
+        segments.extend(literal.split('/')[1:])
+
+    # leading slash is ignored, same as for regex URL patterns
+    if len(segments) > 1 and segments[0] == '':
+        segments.pop(0)
+
+    return segments
+
+
+class Router(object):
+    def __init__(self):
+        self._root = Node()
+        self._patterns = []
+
+    def add(self, path, value):
+        """
+        Registers `value` for the URL template `path`. When templates
+        of two values have same segments, the first one is resolved.
+        """
+
+        template = compile_template(path)
+        segments = split_template(template)
+
+        if segments is None:
+            pattern = template.to_django_urlpattern()
+            if pattern.startswith('/'):
+                pattern = pattern[1:]
+            self._patterns.append((re.compile('^%s$' % pattern), value))
+            return
+
+        node = self._root
+
+        for segment in segments:
+            if segment is None:
+                if node.param is None:
+                    node.param = Node()
+                node = node.param
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = Node()
+                node = child
+
+        if node.target is None:
+            node.target = (value, template.names)
+
+    def _match(self, node, segments, index, values):
+        if index == len(segments):
+            return node.target
+
+        segment = segments[index]
+        child = node.children.get(segment)
+
+        if child is not None:
+            target = self._match(child, segments, index + 1, values)
+            if target is not None:
+                return target
+
+        if node.param is not None and segment:
+            values.append(segment)
+            target = self._match(node.param, segments, index + 1, values)
+            if target is not None:
+                return target
+            values.pop()
+
+    def resolve(self, path):
+        """
+        Returns `(value, kwargs)` tuple for the `path` (relative to the
+        API prefix), or None if no template matches.
+        """
+
+        values = []
+        target = self._match(self._root, path.split('/'), 0, values)
+
+        if target is not None:
+            value, names = target
+            return value, dict(zip(names, values))
+
+        for pattern, value in self._patterns:
+            match = pattern.match(path)
+            if match:
+                return value, match.groupdict()
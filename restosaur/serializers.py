@@ -1,46 +1,321 @@
+import codecs
 import json
 import datetime
 import decimal
+import re
+from collections import OrderedDict
 
 
 __all__ = [
-        'JsonSerializer', 'MultiPartFormDataSerializer',
-        'default_serializers']
+        'JsonSerializer', 'MsgpackSerializer', 'CborSerializer',
+        'MultiPartFormDataSerializer', 'default_serializers',
+        'get_json_backend']
+
+
+def restful_default(obj):
+    """
+    Converts objects unsupported by JSON into serializable values.
+    Raises TypeError for unknown objects.
+    """
+
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    elif isinstance(obj, datetime.date):
+        return obj.isoformat()
+    elif isinstance(obj, datetime.timedelta):
+        return (datetime.datetime.min + obj).time().isoformat()
+    elif isinstance(obj, decimal.Decimal):
+        return float(str(obj))
+    raise TypeError('%r is not JSON serializable' % (obj,))
+
+
+def restful_values(obj):
+    """
+    Returns a copy of `obj` with dates, timedeltas and decimals nested
+    in dicts, lists and tuples converted by `restful_default()`.
+    Byte strings are decoded as UTF-8 text, same as by JSON encoder.
+
+    Used for encoders which handle these types natively in a different
+    way than `DefaultRestfulEncoder`.
+    """
+
+    if isinstance(obj, dict):
+        return dict(
+            (restful_values(key), restful_values(value))
+            for key, value in obj.iteritems())
+    elif isinstance(obj, (list, tuple)):
+        return [restful_values(value) for value in obj]
+    elif isinstance(obj, str):
+        return obj.decode('utf-8')
+    elif isinstance(obj, (
+            datetime.date, datetime.timedelta, decimal.Decimal)):
+        return restful_values(restful_default(obj))
+    return obj
 
 
 class DefaultRestfulEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        elif isinstance(obj, datetime.date):
-            return obj.isoformat()
-        elif isinstance(obj, datetime.timedelta):
-            return (datetime.datetime.min + obj).time().isoformat()
-        elif isinstance(obj, decimal.Decimal):
-            return float(str(obj))
-        else:
-            return super(DefaultRestfulEncoder, self).default(obj)
+        return restful_default(obj)
+
+
+class JsonBackendUnavailable(Exception):
+    pass
+
+
+class StdlibJsonBackend(object):
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = DefaultRestfulEncoder()
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, txt):
+        return json.loads(txt)
+
+
+class SimpleJsonBackend(StdlibJsonBackend):
+    """
+    Encodes using `simplejson`. Objects which it can't encode (i.e.
+    integers out of 64-bit range) are encoded using the standard
+    library, which is also used for decoding.
+    """
+
+    name = 'simplejson'
+    fallback_errors = (TypeError, ValueError, OverflowError)
+
+    def __init__(self):
+        super(SimpleJsonBackend, self).__init__()
+        try:
+            import simplejson
+        except ImportError:
+            raise JsonBackendUnavailable(self.name)
+        self._simplejson_encoder = simplejson.JSONEncoder(
+                default=restful_default, use_decimal=False,
+                namedtuple_as_object=False)
+
+    def dumps(self, obj):
+        try:
+            return self._simplejson_encoder.encode(obj)
+        except self.fallback_errors:
+            return super(SimpleJsonBackend, self).dumps(obj)
+
+
+json_backends = OrderedDict((backend.name, backend) for backend in (
+    SimpleJsonBackend, StdlibJsonBackend))
+
+
+def get_json_backend(name=None):
+    """
+    Returns an instance of JSON backend named `name`, or the fastest
+    available one if `name` is not provided.
+    """
+
+    if name:
+        return json_backends[name]()
+
+    for backend in json_backends.values():
+        try:
+            return backend()
+        except JsonBackendUnavailable:
+            pass
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+DELIMITERS = frozenset(u' \t\n\r,]')
+
+
+def iter_json_array(stream, chunk_size=65536, encoding='utf-8'):
+    """
+    Yields items of a top-level JSON array read incrementally from
+    the file-like `stream` in `chunk_size` bytes chunks, so only a single
+    item and a chunk of the input are held in memory at once.
+
+    Raises ValueError when the input is not a valid JSON array,
+    including any data after the closing bracket.
+    """
+
+    decode = json.JSONDecoder().raw_decode
+    textdecoder = codecs.getincrementaldecoder(encoding)()
+    buf = u''
+    pos = 0
+    eof = False
+    expect = '['
+
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        value = None
+
+        if pos < len(buf):
+            if expect == 'value':
+                try:
+                    value, end = decode(buf, pos)
+                except ValueError:
+                    end = None
+                # a number may continue in the next chunk, so a value
+                # must be followed by a delimiter or the end of input
+                if end is not None and (
+                        eof or (end < len(buf) and buf[end] in DELIMITERS)):
+                    yield value
+                    pos = end
+                    expect = ','
+                    continue
+            elif expect == '[':
+                if buf[pos] != '[':
+                    raise ValueError('Expected JSON array')
+                pos += 1
+                expect = 'first'
+                continue
+            elif expect == 'end':
+                raise ValueError('Extra data after JSON array')
+            elif buf[pos] == ']':
+                pos += 1
+                expect = 'end'
+                continue
+            elif expect == 'first':
+                expect = 'value'
+                continue
+            elif buf[pos] == ',':
+                pos += 1
+                expect = 'value'
+                continue
+            else:
+                raise ValueError('Expected `,` or `]`, got %r' % buf[pos])
+
+        if eof:
+            if expect == 'end':
+                return
+            raise ValueError('Unexpected end of JSON array')
+
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + textdecoder.decode(chunk, final=eof)
+        pos = 0
 
 
 class DateTimeJsonSerializer(object):
+    def __init__(self, backend=None):
+        self.backend = get_json_backend(backend)
+
     def dumps(self, obj):
-        return json.dumps(obj, cls=DefaultRestfulEncoder)
+        return self.backend.dumps(obj)
 
     def loads(self, txt):
-        obj = json.loads(txt)
-        return obj
+        return self.backend.loads(txt)
 
 
 class JsonSerializer(object):
-    def __init__(self):
-        self._json = DateTimeJsonSerializer()
+    def __init__(self, backend=None):
+        self._json = DateTimeJsonSerializer(backend)
 
     def loads(self, ctx):
         return self._json.loads(ctx.raw)
 
+    def loads_iter(self, ctx, chunk_size=65536):
+        """
+        Returns a generator of top-level array items deserialized
+        incrementally from the request stream, decoded using charset
+        of the request (UTF-8 by default)
+        """
+
+        return iter_json_array(
+                ctx.request, chunk_size=chunk_size,
+                encoding=getattr(ctx.request, 'encoding', None) or 'utf-8')
+
     def dumps(self, data):
         return self._json.dumps(data)
 
+    def dumps_iter(self, key, items, tail, chunk_size=65536):
+        """
+        Yields JSON chunks of an object containing `items` iterable
+        as an array under the `key`, followed by members of a mapping
+        returned by `tail()` callable, which is called after exhausting
+        `items`.
+
+        Chunks are buffered up to `chunk_size` bytes.
+        """
+
+        dumps = self.dumps
+        buf = ['{%s: [' % dumps(key)]
+        size = 0
+        separator = ''
+
+        for item in items:
+            chunk = dumps(item)
+            buf.append(separator)
+            buf.append(chunk)
+            separator = ', '
+            size += len(chunk)
+            if size >= chunk_size:
+                yield ''.join(buf)
+                buf = []
+                size = 0
+
+        buf.append(']')
+        for name, value in tail().items():
+            buf.append(', %s: %s' % (dumps(name), dumps(value)))
+        buf.append('}')
+        yield ''.join(buf)
+
+
+class SerializerUnavailable(Exception):
+    pass
+
+
+class MsgpackSerializer(object):
+    """
+    MessagePack serializer (requires `msgpack>=0.5.2` package, which
+    provides a pure Python implementation when the C extension is not
+    available).
+
+    Integers out of 64-bit range can't be encoded.
+    """
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise SerializerUnavailable('msgpack')
+        self._msgpack = msgpack
+        # byte strings are text on Python 2, same as for JSON
+        self._packer_options = {
+                'default': restful_default,
+                'use_bin_type': bytes is not str,
+                }
+
+    def loads(self, ctx):
+        return self._msgpack.unpackb(ctx.raw, raw=False)
+
+    def dumps(self, data):
+        return self._msgpack.packb(data, **self._packer_options)
+
+
+class CborSerializer(object):
+    """
+    CBOR serializer (requires `cbor2` package, which provides a pure
+    Python implementation when the C extension is not available).
+
+    Dates, timedeltas and decimals are encoded as strings and numbers,
+    as by `DefaultRestfulEncoder`, instead of CBOR tagged values.
+    """
+
+    def __init__(self):
+        try:
+            import cbor2
+        except ImportError:
+            raise SerializerUnavailable('cbor2')
+        self._cbor2 = cbor2
+
+    def _default(self, encoder, obj):
+        encoder.encode(restful_values(restful_default(obj)))
+
+    def loads(self, ctx):
+        return self._cbor2.loads(ctx.raw)
+
+    def dumps(self, data):
+        return self._cbor2.dumps(restful_values(data), default=self._default)
+
 
 class MultiPartFormDataSerializer(object):
     def loads(self, ctx):
@@ -61,6 +336,7 @@ class AlreadyRegistered(Exception):
 class SerializersRegistry(object):
     def __init__(self):
         self._serializers = {}
+        self.version = 0
 
     def _key(self, mimetype):
         return mimetype.lower()
@@ -73,6 +349,7 @@ class SerializersRegistry(object):
         if key in self._serializers:
             raise AlreadyRegistered(key)
         self._serializers[key] = instance
+        self.version += 1
 
     def mimetypes(self):
         return self._serializers.keys()
@@ -3,3 +3,6 @@ from django.conf import settings
 AUTODISCOVER = getattr(settings, 'RESTOSAUR_AUTODISCOVER', True)
 AUTODISCOVER_MODULE = getattr(
         settings, 'RESTOSAUR_AUTODISCOVER_MODULE', 'restapi')
+NEGOTIATION_CACHE_SIZE = getattr(
+        settings, 'RESTOSAUR_NEGOTIATION_CACHE_SIZE', 64)
+FIELDS_PARAMETER = getattr(settings, 'RESTOSAUR_FIELDS_PARAMETER', 'fields')
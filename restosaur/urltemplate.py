@@ -1,31 +1,85 @@
 import re
 
+from .utils import LRUCache
+
 RE_PARAMS = re.compile('(/:([a-zA-Z_]+))')
 
 
-def to_url(urltemplate, params, strict=False):
-    uri = urltemplate
+class URLTemplate(object):
+    """
+    Compiled URL template.
+
+    The template is split once into literal segments and parameter
+    slots, so expanding it is a single join and requires no regex
+    matching.
+    """
+
+    def __init__(self, template):
+        self.template = template
+
+        literals = []
+        names = []
+        pos = 0
 
-    params_to_replace = RE_PARAMS.findall(urltemplate)
+        for match in RE_PARAMS.finditer(template):
+            literals.append(template[pos:match.start()])
+            names.append(match.group(2))
+            pos = match.end()
+        literals.append(template[pos:])
 
-    if params_to_replace:
-        for needle, key in params_to_replace:
+        self.literals = tuple(literals)
+        self.names = tuple(names)
+        self._slots = tuple(zip(names, literals[1:]))
+
+    def expand(self, params, strict=False):
+        if not self._slots:
+            return self.template
+
+        parts = [self.literals[0]]
+
+        for name, literal in self._slots:
             try:
-                uri = uri.replace(needle, '/%s' % params[key])
+                parts.append('/%s' % params[name])
             except KeyError:
                 if strict:
                     raise
-    return uri
+                parts.append('/:%s' % name)
+            parts.append(literal)
 
+        return ''.join(parts)
 
-def remove_parameters(urltemplate):
-    uri = urltemplate
+    def remove_parameters(self):
+        return ''.join(self.literals)
+
+    def to_django_urlpattern(self):
+        parts = [self.literals[0]]
+        for name, literal in self._slots:
+            parts.append('/(?P<%s>[^/]+)' % name)
+            parts.append(literal)
+        return ''.join(parts)
 
-    params_to_replace = RE_PARAMS.findall(urltemplate)
-    for needle, key in params_to_replace:
-        uri = uri.replace(needle, '')
-    return uri
+    def __repr__(self):
+        return '<URLTemplate: %s>' % self.template
+
+
+_compiled = LRUCache(512)
+
+
+def compile_template(urltemplate):
+    template = _compiled.get(urltemplate)
+    if template is None:
+        template = URLTemplate(urltemplate)
+        _compiled.set(urltemplate, template)
+    return template
+
+
+def to_url(urltemplate, params, strict=False):
+    return compile_template(urltemplate).expand(params, strict=strict)
+
+
+def remove_parameters(urltemplate):
+    return compile_template(urltemplate).remove_parameters()
 
 
 def to_django_urlpattern(path):
-    return RE_PARAMS.sub('/(?P<\\2>[^/]+)', path)
+    return compile_template(path).to_django_urlpattern()
@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 
 
 def model_to_dict(obj, context):
@@ -12,3 +14,51 @@ def model_to_dict(obj, context):
         data[field.column] = getattr(obj, field_name)
 
     return data
+
+
+class LRUCache(object):
+    """
+    Bounded, thread-safe mapping which discards the least recently used
+    items when `maxsize` is exceeded.
+
+    Lookups made by `get()` are counted in `hits` and `misses` attributes.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -25,7 +25,7 @@ setup(name='restosaur',
       url='https://github.com/marcinn/restosaur',
       install_requires = ['mimeparse', 'times>=0.7'],
       keywords='web rest python django',
-      packages=find_packages('.'),
+      packages=find_packages('.', exclude=['benchmarks']),
       include_package_data=True,
       test_suite='nose.collector',
       zip_safe=True,
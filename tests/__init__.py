@@ -2,7 +2,18 @@ from django.conf import settings
 
 settings.configure(**{
     'ALLOWED_HOSTS': ['testserver'],
-    'INSTALLED_APPS': ['restosaur'],
+    'INSTALLED_APPS': ['restosaur', 'tests.testapp'],
+    'DATABASES': {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            },
+        },
     'DEBUG': False,
     })
 
+import django
+
+if hasattr(django, 'setup'):
+    django.setup()
+
@@ -64,3 +64,102 @@ class APIPathsTestCase(APITestCase):
         resp_json = json.loads(resp.content)
         self.assertEqual(resp_json['root'], 'ok')
 
+
+
+class RecordingMiddleware(object):
+    def __init__(self, name, calls, bypass=False, stop=False):
+        self.name = name
+        self.calls = calls
+        self.bypass = bypass
+        self.stop = stop
+
+    def process_request(self, request, context):
+        self.calls.append((self.name, 'request'))
+        if self.bypass:
+            return False
+
+    def process_response(self, request, response, context):
+        self.calls.append((self.name, 'response'))
+        if self.stop:
+            return False
+
+
+class ResponseOnlyMiddleware(object):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def process_response(self, request, response, context):
+        self.calls.append(('response-only', 'response'))
+
+
+class APIMiddlewaresTestCase(APITestCase):
+    def setUp(self):
+        super(APIMiddlewaresTestCase, self).setUp()
+        self.calls = []
+        self.api = API('/')
+        self.entity = self.api.resource('entity')
+
+        @self.entity.get()
+        def entity_view(ctx):
+            self.calls.append(('resource', 'call'))
+            return ctx.Entity({'some': 'test'})
+
+    def middleware(self, name, **kw):
+        return RecordingMiddleware(name, self.calls, **kw)
+
+    def test_calling_middlewares_in_order(self):
+        self.api.add_middlewares(
+                self.middleware('a'), ResponseOnlyMiddleware(self.calls),
+                self.middleware('b'))
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('a', 'request'), ('b', 'request'), ('resource', 'call'),
+            ('b', 'response'), ('response-only', 'response'),
+            ('a', 'response')])
+
+    def test_bypassing_resource_call(self):
+        self.api.middlewares = [
+                self.middleware('a'), self.middleware('b', bypass=True),
+                self.middleware('c')]
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('a', 'request'), ('b', 'request'),
+            ('b', 'response'), ('a', 'response')])
+
+    def test_bypassing_resource_call_by_last_middleware(self):
+        self.api.add_middlewares(self.middleware('a', bypass=True))
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [('a', 'request'), ('a', 'response')])
+
+    def test_stopping_response_processing(self):
+        self.api.add_middlewares(
+                self.middleware('a'), self.middleware('b', stop=True))
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('a', 'request'), ('b', 'request'), ('resource', 'call'),
+            ('b', 'response')])
+
+    def test_recompiling_chain_after_appending_middleware(self):
+        self.call(self.api, self.entity, 'get')
+        self.api.middlewares.append(self.middleware('a'))
+        del self.calls[:]
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('a', 'request'), ('resource', 'call'), ('a', 'response')])
+
+    def test_recompiling_chain_after_removing_middleware(self):
+        self.api.middlewares = [self.middleware('a'), self.middleware('b')]
+        self.call(self.api, self.entity, 'get')
+        del self.api.middlewares[0]
+        del self.calls[:]
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('b', 'request'), ('resource', 'call'), ('b', 'response')])
+
+    def test_recompiling_chain_after_adding_middlewares(self):
+        self.call(self.api, self.entity, 'get')
+        self.api.add_middlewares(self.middleware('a'))
+        del self.calls[:]
+        self.call(self.api, self.entity, 'get')
+        self.assertEqual(self.calls, [
+            ('a', 'request'), ('resource', 'call'), ('a', 'response')])
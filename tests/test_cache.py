@@ -0,0 +1,142 @@
+import json
+import unittest
+
+from restosaur import API
+from restosaur.cache import InProcessCache, ResponseCache
+from restosaur.dispatch import resource_dispatcher_factory
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+
+        super(ResponseCacheTestCase, self).setUp()
+
+        self.api = API('/')
+        self.rqfactory = RequestFactory()
+        self.calls = []
+        self.cache = ResponseCache(timeout=60)
+        self.entity = self.api.resource('cached', cache=self.cache)
+
+        @self.entity.get()
+        def entity_GET(ctx):
+            self.calls.append(ctx.parameters.get('q'))
+            return ctx.Entity({'calls': len(self.calls)}, etag=True)
+
+        @self.entity.post()
+        def entity_POST(ctx):
+            return ctx.Created()
+
+        @self.entity.representation('vnd.short')
+        def entity_short(obj, ctx):
+            return obj
+
+    def call(self, method, *args, **kw):
+        rq = getattr(self.rqfactory, method)('/cached', *args, **kw)
+        return resource_dispatcher_factory(self.api, self.entity)(rq)
+
+    def test_marking_first_response_as_miss(self):
+        resp = self.call('get')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+    def test_returning_cached_response(self):
+        first = self.call('get')
+        second = self.call('get')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(len(self.calls), 1)
+
+    def test_not_caching_methods_without_callbacks(self):
+        self.call('get')
+        resp = self.call('head')
+        self.assertEqual(resp.status_code, 405)
+        self.assertFalse(resp.has_header('X-Cache'))
+
+    def test_caching_responses_per_method(self):
+        @self.entity._decorator('HEAD')
+        def entity_HEAD(ctx):
+            return ctx.Entity({'head': True})
+
+        self.call('get')
+        resp = self.call('head')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+    def test_caching_responses_per_query(self):
+        self.call('get', {'q': 'foo'})
+        resp = self.call('get', {'q': 'bar'})
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(self.calls, ['foo', 'bar'])
+
+    def test_caching_responses_per_representation(self):
+        self.call('get')
+        resp = self.call('get', HTTP_ACCEPT='application/vnd.short+json')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp['Content-Type'], 'application/vnd.short+json')
+
+    def test_invalidating_cache(self):
+        self.call('get')
+        self.cache.invalidate(self.entity)
+        resp = self.call('get')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(json.loads(resp.content)['calls'], 2)
+
+    def test_invalidating_cache_after_unsafe_request(self):
+        self.call('get')
+        self.call('post')
+        resp = self.call('get')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+    def test_invalidating_cache_on_signal(self):
+        from django.dispatch import Signal
+
+        signal = Signal()
+        self.cache.invalidate_on(signal, self.entity)
+        self.call('get')
+        signal.send(sender=None)
+        self.assertEqual(self.call('get')['X-Cache'], 'MISS')
+
+    def test_returning_not_modified_for_cached_etag(self):
+        etag = self.call('get')['ETag']
+        resp = self.call('get', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['X-Cache'], 'HIT')
+
+    def test_copying_cached_headers_to_not_modified_response(self):
+        headers = {
+            'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language',
+            'Last-Modified': 'Fri, 01 Jul 2016 12:00:00 GMT'}
+        entity = self.api.resource('headers', cache=self.cache)
+
+        @entity.get()
+        def entity_GET(ctx):
+            return ctx.Entity({}, etag=True, headers=headers)
+
+        def call(**kw):
+            rq = self.rqfactory.get('/headers', **kw)
+            return resource_dispatcher_factory(self.api, entity)(rq)
+
+        etag = call()['ETag']
+        resp = call(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['X-Cache'], 'HIT')
+        for header, value in headers.items():
+            self.assertEqual(resp[header], value)
+
+    def test_varying_on_headers(self):
+        self.entity._cache = ResponseCache(vary=['authorization'])
+        self.call('get', HTTP_AUTHORIZATION='foo')
+        resp = self.call('get', HTTP_AUTHORIZATION='bar')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+
+class InProcessCacheTestCase(unittest.TestCase):
+    def test_expiring_entries(self):
+        cache = InProcessCache()
+        cache.set('foo', 'bar', -1)
+        self.assertEqual(cache.get('foo'), None)
+
+    def test_storing_entries_without_timeout(self):
+        cache = InProcessCache()
+        cache.set('foo', 'bar', None)
+        self.assertEqual(cache.get('foo'), 'bar')
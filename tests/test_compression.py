@@ -0,0 +1,209 @@
+import gzip
+import io
+import json
+import unittest
+
+from restosaur import API
+from restosaur.cache import ResponseCache
+from restosaur.compression import (
+        BrotliEncoder, Compression, EncoderUnavailable, GzipEncoder,
+        ZstdEncoder, content_type_matches)
+from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.headers import parse_accept_encoding
+
+
+def gunzip(content):
+    return gzip.GzipFile(fileobj=io.BytesIO(content)).read()
+
+
+def encoder_available(encoder_class):
+    try:
+        encoder_class()
+    except EncoderUnavailable:
+        return False
+    return True
+
+
+class AcceptEncodingTestCase(unittest.TestCase):
+    def test_parsing_qualities(self):
+        self.assertEqual(
+                parse_accept_encoding('gzip;q=0.5, BR, identity;q=0'),
+                {'gzip': 0.5, 'br': 1.0, 'identity': 0.0})
+
+    def test_parsing_x_gzip_as_gzip(self):
+        self.assertEqual(parse_accept_encoding('x-gzip'), {'gzip': 1.0})
+
+    def test_matching_content_types(self):
+        patterns = ('application/json', 'text/*')
+        self.assertTrue(content_type_matches('application/json', patterns))
+        self.assertTrue(content_type_matches(
+            'application/vnd.item+json; charset=utf-8', patterns))
+        self.assertTrue(content_type_matches('text/html', patterns))
+        self.assertFalse(content_type_matches('image/png', patterns))
+
+
+class CompressionNegotiationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.gzip = GzipEncoder()
+        self.other = type('Encoder', (object,), {'name': 'br'})()
+        self.compression = Compression(encoders=[self.other, self.gzip])
+
+    def test_selecting_preferred_encoder(self):
+        self.assertEqual(
+                self.compression.negotiate('gzip, br'), self.other)
+
+    def test_selecting_encoder_with_highest_quality(self):
+        self.assertEqual(
+                self.compression.negotiate('gzip, br;q=0.5'), self.gzip)
+
+    def test_selecting_encoder_by_wildcard(self):
+        self.assertEqual(
+                self.compression.negotiate('br;q=0, *'), self.gzip)
+
+    def test_not_selecting_unaccepted_encoders(self):
+        self.assertEqual(self.compression.negotiate('identity'), None)
+        self.assertEqual(self.compression.negotiate(''), None)
+        self.assertEqual(self.compression.negotiate('gzip;q=0, br;q=0'), None)
+
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+
+        self.rqfactory = RequestFactory()
+        self.api = API('/', compression=Compression(
+            min_size=100, encoders=[GzipEncoder()]))
+
+        self.collection = self.api.resource('items')
+
+        @self.collection.get()
+        def collection_GET(ctx):
+            size = int(ctx.parameters.get('size', 50))
+            return ctx.Collection(
+                    [{'id': x, 'name': 'Item %d' % x} for x in range(size)],
+                    stream='stream' in ctx.parameters, etag=True)
+
+        @self.collection.representation()
+        def item_repr(obj, ctx):
+            return obj
+
+    def call(self, data=None, **extra):
+        rq = self.rqfactory.get(self.collection.path, data or {}, **extra)
+        return resource_dispatcher_factory(self.api, self.collection)(rq)
+
+    def test_compressing_response(self):
+        resp = self.call(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gunzip(resp.content))['items']), 50)
+
+    def test_setting_vary_header(self):
+        resp = self.call(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue('Accept-Encoding' in resp['Vary'])
+
+    def test_setting_vary_header_for_uncompressed_response(self):
+        resp = self.call()
+        self.assertFalse(resp.has_header('Content-Encoding'))
+        self.assertTrue('Accept-Encoding' in resp['Vary'])
+
+    def test_not_compressing_small_response(self):
+        resp = self.call({'size': 0}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(resp.has_header('Content-Encoding'))
+
+    def test_not_compressing_other_content_types(self):
+        self.api.compression.content_types = ('text/*',)
+        resp = self.call(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(resp.has_header('Content-Encoding'))
+        self.assertFalse(resp.has_header('Vary'))
+
+    def test_weakening_etag_of_compressed_response(self):
+        resp = self.call(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(resp['ETag'].startswith('W/"'))
+
+    def test_weakening_etag_of_small_response(self):
+        resp = self.call({'size': 0}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(resp['ETag'].startswith('W/"'))
+
+    def assertNotModifiedSameAsFull(self, call):
+        full = call(HTTP_ACCEPT_ENCODING='gzip')
+        resp = call(
+                HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=full['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], full['ETag'])
+        self.assertTrue('Accept-Encoding' in resp['Vary'])
+
+    def test_sending_same_validator_with_not_modified_response(self):
+        self.assertNotModifiedSameAsFull(self.call)
+
+    def test_sending_same_validator_for_version_etag(self):
+        resource = self.api.resource('versioned')
+
+        @resource.get()
+        def versioned_GET(ctx):
+            return ctx.Collection(
+                    [{'id': x} for x in range(50)], version=1)
+
+        def call(**extra):
+            rq = self.rqfactory.get(resource.path, **extra)
+            return resource_dispatcher_factory(self.api, resource)(rq)
+
+        self.assertNotModifiedSameAsFull(call)
+
+    def test_sending_same_validator_for_cached_response(self):
+        self.collection._cache = ResponseCache()
+        self.assertNotModifiedSameAsFull(self.call)
+
+    def test_compressing_streamed_response(self):
+        resp = self.call(
+                {'stream': '1', 'size': 1000}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        content = gunzip(b''.join(resp.streaming_content))
+        self.assertEqual(len(json.loads(content)['items']), 1000)
+
+    def test_caching_responses_per_encoding(self):
+        self.collection._cache = ResponseCache()
+        self.call(HTTP_ACCEPT_ENCODING='gzip')
+        resp = self.call()
+        self.assertFalse(resp.has_header('Content-Encoding'))
+        self.assertEqual(len(json.loads(resp.content)['items']), 50)
+
+
+class EncoderConformanceMixin(object):
+    encoder_class = None
+
+    def decompress(self, data):
+        raise NotImplementedError
+
+    def test_compressing_data(self):
+        data = b'{"foo": "bar"}' * 100
+        encoder = self.encoder_class()
+        self.assertEqual(self.decompress(encoder.compress(data)), data)
+
+    def test_compressing_chunks(self):
+        chunks = [b'{"foo": "bar"}' * 10] * 10
+        encoder = self.encoder_class()
+        compressed = b''.join(encoder.compress_iter(iter(chunks)))
+        self.assertEqual(self.decompress(compressed), b''.join(chunks))
+
+
+class GzipEncoderTestCase(EncoderConformanceMixin, unittest.TestCase):
+    encoder_class = GzipEncoder
+
+    def decompress(self, data):
+        return gunzip(data)
+
+
+@unittest.skipUnless(encoder_available(BrotliEncoder), 'brotli is not available')
+class BrotliEncoderTestCase(EncoderConformanceMixin, unittest.TestCase):
+    encoder_class = BrotliEncoder
+
+    def decompress(self, data):
+        return BrotliEncoder()._brotli.decompress(data)
+
+
+@unittest.skipUnless(encoder_available(ZstdEncoder), 'zstandard is not available')
+class ZstdEncoderTestCase(EncoderConformanceMixin, unittest.TestCase):
+    encoder_class = ZstdEncoder
+
+    def decompress(self, data):
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
@@ -2,7 +2,7 @@ import unittest
 import datetime
 
 from restosaur import API, responses
-from restosaur.context import Context
+from restosaur.context import Context, QueryDict
 from restosaur.dispatch import build_context
 from restosaur.resource import Resource
 
@@ -239,3 +239,134 @@ class TestContextResponseFactories(ContextTestCase):
         self.assertTrue(isinstance(obj, responses.SeeOtherResponse))
 
 
+
+class TestContextIfNoneMatch(ContextTestCase):
+    def test_matching_etag(self):
+        ctx = self.factory('get', '/foo/', lambda ctx: None, headers={
+            'if-none-match': '"foo", "bar"',
+            })
+        self.assertTrue(ctx.etag_matches('"bar"'))
+
+    def test_matching_etag_using_weak_comparison(self):
+        ctx = self.factory('get', '/foo/', lambda ctx: None, headers={
+            'if-none-match': 'W/"foo"',
+            })
+        self.assertTrue(ctx.etag_matches('"foo"'))
+        self.assertTrue(ctx.etag_matches('W/"foo"'))
+
+    def test_not_matching_etag(self):
+        ctx = self.factory('get', '/foo/', lambda ctx: None, headers={
+            'if-none-match': '"foo"',
+            })
+        self.assertFalse(ctx.etag_matches('"bar"'))
+
+    def test_not_matching_etag_without_header(self):
+        ctx = self.factory('get', '/foo/', lambda ctx: None)
+        self.assertFalse(ctx.etag_matches('"foo"'))
+
+
+class TestQueryDict(unittest.TestCase):
+    def test_single_value_is_returned_directly(self):
+        params = QueryDict([('foo', ['bar'])])
+        self.assertEqual(params['foo'], 'bar')
+        self.assertEqual(params.getlist('foo'), ['bar'])
+
+    def test_multiple_values_are_returned_as_list(self):
+        params = QueryDict([('foo', 'bar'), ('foo', 'baz')])
+        self.assertEqual(params['foo'], ['bar', 'baz'])
+
+    def test_update_replaces_values_of_existing_keys(self):
+        params = QueryDict({'foo': ['bar', 'baz'], 'spam': 'eggs'})
+        params.update({'foo': 'qux'})
+        self.assertEqual(params['foo'], 'qux')
+        self.assertEqual(params['spam'], 'eggs')
+
+    def test_setlists_copies_values(self):
+        values = ['bar', 'baz']
+        params = QueryDict()
+        params.setlists([('foo', values)])
+        params.getlist('foo').append('qux')
+        self.assertEqual(values, ['bar', 'baz'])
+
+    def test_copying_querydict(self):
+        params = QueryDict({'foo': ['bar', 'baz']})
+        copy = QueryDict(params)
+        copy.getlist('foo').append('qux')
+        self.assertEqual(params['foo'], ['bar', 'baz'])
+
+    def test_popping_item(self):
+        params = QueryDict({'foo': ['bar', 'baz']})
+        self.assertEqual(params.popitem(), ('foo', ['bar', 'baz']))
+        self.assertEqual(len(params), 0)
+        self.assertRaises(KeyError, params.popitem)
+
+    def test_items_are_flattened(self):
+        params = QueryDict({'foo': ['bar', 'baz']})
+        self.assertEqual(
+                sorted(params.items()), [('foo', 'bar'), ('foo', 'baz')])
+
+    def test_urlencode(self):
+        params = QueryDict({'foo': [u'b\xe4r', 'baz']})
+        self.assertEqual(params.urlencode(), 'foo=b%C3%A4r&foo=baz')
+
+    def test_querydict_is_a_mapping_without_dict(self):
+        import collections
+        params = QueryDict()
+        self.assertTrue(isinstance(params, collections.MutableMapping))
+        self.assertFalse(hasattr(params, '__dict__'))
+
+    def test_build_context_parses_query_over_url_kwargs(self):
+        from django.test import RequestFactory
+        request = RequestFactory().get('/foo/', {'pk': '2', 'tag': ['a', 'b']})
+        request.resolver_match = type(
+                'ResolverMatch', (object,), {'kwargs': {'pk': '1'}})()
+        ctx = build_context(API('/'), Resource('foo'), request)
+        self.assertEqual(ctx.parameters['pk'], '2')
+        self.assertEqual(ctx.parameters['tag'], ['a', 'b'])
+
+
+class TestContextLazyRequestData(ContextTestCase):
+    def test_get_request_body_is_not_read(self):
+        from restosaur.dispatch import resource_dispatcher_factory
+
+        resource = self.api.resource('foo')
+
+        @resource.get()
+        def foo(ctx):
+            return ctx.Response({'foo': ctx.parameters.get('foo')})
+
+        request = self.rqfactory.get('/foo', {'foo': 'bar'})
+        response = resource_dispatcher_factory(self.api, resource)(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(request, '_body'))
+        self.assertFalse(hasattr(request, '_post'))
+
+    def test_reading_body_and_form_data_on_access(self):
+        request = self.rqfactory.post('/foo', {'foo': 'bar'})
+        ctx = build_context(self.api, Resource('foo'), request)
+        self.assertEqual(ctx.data['foo'], 'bar')
+        self.assertEqual(ctx.files, {})
+
+    def test_raw_body_is_none_after_multipart_parsing(self):
+        request = self.rqfactory.post('/foo', {'foo': 'bar'})
+        ctx = build_context(self.api, Resource('foo'), request)
+        ctx.data
+        self.assertEqual(ctx.raw, None)
+
+    def test_explicit_values_are_not_read_from_request(self):
+        request = self.rqfactory.post('/foo?spam=eggs', {'foo': 'bar'})
+        ctx = Context(
+                self.api, request, Resource('foo'), 'POST',
+                parameters={'spam': 'ham'}, data={}, raw='')
+        self.assertEqual(ctx.parameters['spam'], 'ham')
+        self.assertEqual(ctx.data, {})
+        self.assertEqual(ctx.raw, '')
+        self.assertFalse(hasattr(request, '_body'))
+
+    def test_explicit_parameters_are_copied(self):
+        parameters = QueryDict({'spam': 'ham'})
+        ctx = Context(
+                self.api, None, Resource('foo'), 'GET', parameters=parameters)
+        ctx.parameters['spam'] = 'eggs'
+        self.assertEqual(parameters['spam'], 'ham')
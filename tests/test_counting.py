@@ -0,0 +1,76 @@
+import json
+import unittest
+
+import django
+
+from restosaur import API
+from restosaur.counting import (
+        count_queryset, estimate_count, get_count_strategy)
+from restosaur.dispatch import resource_dispatcher_factory
+
+
+class CollectionCountTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+
+        super(CollectionCountTestCase, self).setUp()
+
+        self.api = API('/')
+        self.rqfactory = RequestFactory()
+        self.collection = self.api.resource('counted')
+        self.count = True
+
+        @self.collection.get()
+        def collection_GET(ctx):
+            items = (x for x in range(4))
+            return ctx.Collection(items, count=self.count)
+
+    def call(self):
+        rq = self.rqfactory.get('/counted')
+        resp = resource_dispatcher_factory(self.api, self.collection)(rq)
+        return json.loads(resp.content)
+
+    def test_counting_generator_items_by_default(self):
+        self.assertEqual(self.call()['totalCount'], 4)
+
+    def test_skipping_count(self):
+        self.count = None
+        self.assertFalse('totalCount' in self.call())
+
+    def test_counting_using_custom_strategy(self):
+        self.count = lambda iterable, length: length * 10
+        self.assertEqual(self.call()['totalCount'], 40)
+
+    def test_preferring_explicit_total_count(self):
+        from restosaur.responses import CollectionResponse
+        response = CollectionResponse(None, [], totalCount=5, count='len')
+        self.assertEqual(response.get_total_count([], 0), 5)
+
+    def test_raising_key_error_for_unknown_strategy(self):
+        self.assertRaises(KeyError, get_count_strategy, 'foo')
+
+    def test_falling_back_to_length_for_non_querysets(self):
+        self.assertEqual(count_queryset(iter([]), 3), 3)
+        self.assertEqual(estimate_count(iter([]), 3), 3)
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class QuerysetCountTestCase(unittest.TestCase):
+    def setUp(self):
+        from .testapp import create_tables
+        from .testapp.models import Author
+
+        create_tables()
+        Author.objects.all().delete()
+        for name in ('John', 'Jane', 'Jim'):
+            Author.objects.create(name=name)
+        self.queryset = Author.objects.all()
+
+    def test_counting_queryset_rows(self):
+        self.assertEqual(count_queryset(self.queryset, 0), 3)
+
+    def test_estimating_count_using_exact_count_on_sqlite(self):
+        queryset = self.queryset.filter(name__startswith='J')
+        self.assertEqual(estimate_count(queryset, 0), 3)
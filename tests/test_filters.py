@@ -0,0 +1,46 @@
+import unittest
+
+import django
+
+from restosaur.filters import (
+        QuerysetFilter, clear_filter_forms, filter_form_factory)
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class FilterFormFactoryTestCase(unittest.TestCase):
+    def setUp(self):
+        clear_filter_forms()
+
+    def tearDown(self):
+        clear_filter_forms()
+
+    def test_building_optional_fields_of_model(self):
+        from .testapp.models import Article
+
+        form_class = filter_form_factory(Article)
+        self.assertEqual(
+                set(form_class.base_fields),
+                set(['author_id', 'title', 'content', 'published', 'rating']))
+        self.assertFalse(form_class.base_fields['title'].required)
+
+    def test_reusing_form_class_of_model(self):
+        from .testapp.models import Article
+
+        self.assertTrue(
+                filter_form_factory(Article) is filter_form_factory(Article))
+
+    def test_building_new_form_class_after_clearing(self):
+        from .testapp.models import Article
+
+        form_class = filter_form_factory(Article)
+        clear_filter_forms()
+        self.assertFalse(filter_form_factory(Article) is form_class)
+
+    def test_sharing_form_class_between_filters(self):
+        from .testapp.models import Article
+
+        self.assertTrue(
+                QuerysetFilter(Article.objects.all()).form_class is
+                QuerysetFilter(Article.objects.all()).form_class)
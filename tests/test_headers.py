@@ -0,0 +1,64 @@
+import unittest
+
+from restosaur.headers import Headers
+
+
+class HeadersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.meta = {
+            'HTTP_ACCEPT': 'application/json',
+            'HTTP_X_HTTP_METHOD_OVERRIDE': 'PATCH',
+            'CONTENT_TYPE': 'text/plain',
+            'REMOTE_ADDR': '127.0.0.1',
+            }
+        self.headers = Headers(self.meta)
+
+    def test_getting_header_from_meta(self):
+        self.assertEqual(self.headers['accept'], 'application/json')
+
+    def test_getting_header_case_insensitive(self):
+        self.assertEqual(self.headers['Accept'], 'application/json')
+        self.assertEqual(self.headers['X-HTTP-Method-Override'], 'PATCH')
+
+    def test_not_exposing_non_http_meta_keys(self):
+        self.assertFalse('content-type' in self.headers)
+        self.assertFalse('remote-addr' in self.headers)
+
+    def test_returning_default_for_missing_header(self):
+        self.assertEqual(self.headers.get('if-none-match', 'foo'), 'foo')
+
+    def test_iterating_over_normalized_names(self):
+        self.assertEqual(
+                sorted(self.headers), ['accept', 'x-http-method-override'])
+
+    def test_copying_headers_to_dict(self):
+        copy = self.headers.copy()
+        copy['accept'] = 'text/html'
+        self.assertEqual(copy, {
+            'accept': 'text/html', 'x-http-method-override': 'PATCH'})
+        self.assertEqual(self.headers['accept'], 'application/json')
+
+    def test_checking_header_using_has_key(self):
+        self.assertTrue(self.headers.has_key('Accept'))  # NOQA
+        self.assertFalse(self.headers.has_key('if-none-match'))  # NOQA
+
+    def test_overriding_meta_value(self):
+        headers = Headers(self.meta, {'Accept': 'text/html'})
+        self.assertEqual(headers['accept'], 'text/html')
+        self.assertEqual(len(headers), 2)
+
+    def test_deleting_header(self):
+        del self.headers['accept']
+        self.assertFalse('accept' in self.headers)
+        self.assertEqual(self.meta['HTTP_ACCEPT'], 'application/json')
+
+    def test_raising_key_error_when_deleting_missing_header(self):
+        def delete():
+            del self.headers['foo']
+        self.assertRaises(KeyError, delete)
+
+    def test_comparing_with_dict(self):
+        self.assertEqual(dict(self.headers), {
+            'accept': 'application/json',
+            'x-http-method-override': 'PATCH',
+            })
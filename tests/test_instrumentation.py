@@ -0,0 +1,73 @@
+import unittest
+
+from restosaur import API
+from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.instrumentation import MemorySink, StatsdSink
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+
+        super(InstrumentationTestCase, self).setUp()
+
+        self.sink = MemorySink()
+        self.api = API('/', instrumentation=self.sink)
+        self.rqfactory = RequestFactory()
+
+        self.entity = self.api.resource('entity')
+
+        @self.entity.get()
+        @self.entity.post()
+        def entity_view(ctx):
+            return ctx.Entity({'some': 'test'})
+
+    def call(self, resource, method, *args, **kw):
+        rq = getattr(self.rqfactory, method)(resource.path, *args, **kw)
+        return resource_dispatcher_factory(self.api, resource)(rq)
+
+    def test_recording_request_stages(self):
+        self.call(self.entity, 'get')
+        self.assertEqual(self.sink.stages(), [
+            'context', 'middleware.request', 'negotiation', 'callback',
+            'conversion', 'serialization', 'middleware.response',
+            'request'])
+
+    def test_recording_deserialization_stage(self):
+        self.call(
+                self.entity, 'post', '{"foo": "bar"}',
+                content_type='application/json')
+        self.assertTrue('deserialization' in self.sink.stages())
+
+    def test_recording_resource_path_and_duration(self):
+        self.call(self.entity, 'get')
+        path, stage, duration = self.sink.events[0]
+        self.assertEqual(path, 'entity')
+        self.assertTrue(duration >= 0)
+
+    def test_not_recording_without_sink(self):
+        api = API('/')
+        rq = self.rqfactory.get('entity')
+        resource_dispatcher_factory(api, self.entity)(rq)
+        self.assertEqual(self.sink.events, [])
+
+    def test_overriding_api_sink_in_dispatcher(self):
+        sink = MemorySink()
+        rq = self.rqfactory.get('entity')
+        resource_dispatcher_factory(self.api, self.entity, sink)(rq)
+        self.assertTrue(sink.events)
+        self.assertEqual(self.sink.events, [])
+
+    def test_sending_timings_to_statsd_client(self):
+        class Client(object):
+            def __init__(self):
+                self.stats = []
+
+            def timing(self, stat, ms):
+                self.stats.append(stat)
+
+        client = Client()
+        api = API('/', instrumentation=StatsdSink(client, prefix='api'))
+        resource_dispatcher_factory(api, self.entity)(
+                self.rqfactory.get('entity'))
+        self.assertTrue('api.callback' in client.stats)
@@ -0,0 +1,146 @@
+import datetime
+import json
+import unittest
+
+import django
+
+from restosaur import API
+from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.filters import QuerysetFilter
+from restosaur.pagination import (
+        InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor)
+
+
+class CursorTestCase(unittest.TestCase):
+    def test_encoding_and_decoding_cursor(self):
+        cursor = encode_cursor('n', [datetime.datetime(2016, 1, 1), 5])
+        self.assertEqual(
+                decode_cursor(cursor), ('n', ['2016-01-01T00:00:00', 5]))
+
+    def test_raising_invalid_cursor_for_garbage(self):
+        self.assertRaises(InvalidCursor, decode_cursor, 'foo')
+
+    def test_raising_invalid_cursor_for_unknown_direction(self):
+        self.assertRaises(
+                InvalidCursor, decode_cursor, encode_cursor('x', [1]))
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class KeysetPaginatorTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+        from .testapp import create_tables
+        from .testapp.models import Author, Article
+
+        create_tables()
+        Article.objects.all().delete()
+
+        author = Author.objects.create(name='John')
+        published = datetime.datetime(2016, 1, 1)
+
+        for x in range(7):
+            Article.objects.create(
+                    author=author, title='Article %d' % x,
+                    published=published, rating=x % 2)
+
+        self.api = API('/')
+        self.rqfactory = RequestFactory()
+        self.articles = self.api.resource('articles')
+        self.paginator = KeysetPaginator(
+                ordering=('-published', 'pk'), limit=3)
+
+        @self.articles.get()
+        def articles_GET(ctx):
+            return self.paginator.response(
+                    ctx, QuerysetFilter(Article.objects.all()))
+
+        @self.articles.representation()
+        def article_repr(obj, ctx):
+            return obj.title
+
+    def call(self, query=None, uri='/articles'):
+        rq = self.rqfactory.get(uri, query or {})
+        resp = resource_dispatcher_factory(self.api, self.articles)(rq)
+        return resp, json.loads(resp.content)
+
+    def follow(self, data, rel):
+        uri = data['_links'][rel]['uri']
+        return self.call(uri=uri.replace('http://testserver', ''))
+
+    def test_returning_first_page(self):
+        resp, data = self.call()
+        self.assertEqual(
+                data['items'], ['Article 0', 'Article 1', 'Article 2'])
+
+    def test_not_counting_rows_by_default(self):
+        resp, data = self.call()
+        self.assertFalse('totalCount' in data)
+
+    def test_counting_rows_if_requested(self):
+        self.paginator.count = True
+        resp, data = self.call()
+        self.assertEqual(data['totalCount'], 7)
+
+    def test_counting_rows_using_strategy(self):
+        self.paginator.count = 'estimate'
+        resp, data = self.call({'rating': 1})
+        self.assertEqual(data['totalCount'], 3)
+
+    def test_counting_rows_using_callable(self):
+        self.paginator.count = lambda queryset, length: length * 10
+        resp, data = self.call()
+        self.assertEqual(data['totalCount'], 30)
+
+    def test_returning_bad_request_for_invalid_cursor_values(self):
+        for values in (['notadate', 'abc'], [{'x': 1}, 2], [None, [1]]):
+            resp, data = self.call({'cursor': encode_cursor('n', values)})
+            self.assertEqual(resp.status_code, 400)
+            self.assertEqual(data, {'error': 'Invalid cursor'})
+
+    def test_linking_next_page_only_from_first_page(self):
+        resp, data = self.call()
+        self.assertTrue('next' in data['_links'])
+        self.assertFalse('prev' in data['_links'])
+
+    def test_following_next_pages(self):
+        resp, data = self.call()
+        resp, data = self.follow(data, 'next')
+        self.assertEqual(
+                data['items'], ['Article 3', 'Article 4', 'Article 5'])
+        resp, data = self.follow(data, 'next')
+        self.assertEqual(data['items'], ['Article 6'])
+        self.assertFalse('next' in data['_links'])
+
+    def test_following_previous_page(self):
+        resp, data = self.call()
+        resp, data = self.follow(data, 'next')
+        resp, data = self.follow(data, 'next')
+        resp, data = self.follow(data, 'prev')
+        self.assertEqual(
+                data['items'], ['Article 3', 'Article 4', 'Article 5'])
+        resp, data = self.follow(data, 'prev')
+        self.assertEqual(
+                data['items'], ['Article 0', 'Article 1', 'Article 2'])
+        self.assertFalse('prev' in data['_links'])
+
+    def test_keeping_filter_parameters_in_links(self):
+        resp, data = self.call({'rating': '1', 'limit': '2'})
+        self.assertEqual(data['items'], ['Article 1', 'Article 3'])
+        self.assertTrue('rating=1' in data['_links']['next']['uri'])
+        resp, data = self.follow(data, 'next')
+        self.assertEqual(data['items'], ['Article 5'])
+
+    def test_limiting_page_size(self):
+        resp, data = self.call({'limit': '2'})
+        self.assertEqual(len(data['items']), 2)
+
+    def test_clamping_page_size_to_max_limit(self):
+        self.paginator.max_limit = 4
+        resp, data = self.call({'limit': '100'})
+        self.assertEqual(len(data['items']), 4)
+
+    def test_returning_bad_request_for_invalid_cursor(self):
+        resp, data = self.call({'cursor': 'garbage'})
+        self.assertEqual(resp.status_code, 400)
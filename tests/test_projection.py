@@ -0,0 +1,210 @@
+import datetime
+import json
+import unittest
+
+import django
+
+from restosaur import API
+from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.representations import ModelRepresentation
+
+
+class FieldsContext(object):
+    def __init__(self, fields=None):
+        self.fields = fields
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class ProjectQuerysetTestCase(unittest.TestCase):
+    def setUp(self):
+        from .testapp import create_tables
+        from .testapp.models import Author, Article
+
+        create_tables()
+        Article.objects.all().delete()
+
+        author = Author.objects.create(name='John')
+
+        for x in range(3):
+            Article.objects.create(
+                    author=author, title='Article %d' % x,
+                    content='Content %d' % x,
+                    published=datetime.datetime(2016, 1, 1), rating=x)
+
+        self.queryset = Article.objects.order_by('pk')
+
+    def project(self, *args, **kwargs):
+        from restosaur.projection import project_queryset
+        return project_queryset(self.queryset, *args, **kwargs)
+
+    def deferred(self, queryset):
+        from django.db.models.query_utils import DeferredAttribute
+
+        article = list(queryset)[0]
+        return set(
+            name for name in ('title', 'content', 'published', 'rating')
+            if isinstance(type(article).__dict__.get(name),
+                          DeferredAttribute))
+
+    def test_loading_only_required_columns(self):
+        queryset = self.project(['id', 'title'])
+        self.assertEqual(
+                self.deferred(queryset),
+                set(['content', 'published', 'rating']))
+
+    def test_selecting_forward_relations(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        queryset = self.project(['title', 'author__name'])
+
+        with CaptureQueriesContext(connection) as queries:
+            names = [article.author.name for article in queryset]
+
+        self.assertEqual(names, ['John'] * 3)
+        self.assertEqual(len(queries), 1)
+
+    def test_loading_foreign_key_column(self):
+        queryset = self.project(['title', 'author_id'])
+        self.assertEqual(
+                self.deferred(queryset),
+                set(['content', 'published', 'rating']))
+        self.assertFalse(queryset.query.select_related)
+
+    def test_not_limiting_columns_for_properties(self):
+        queryset = self.project(['title', 'summary'])
+        self.assertEqual(self.deferred(queryset), set())
+
+    def test_not_limiting_columns_of_incomplete_lookups(self):
+        queryset = self.project(['title'], complete=False)
+        self.assertEqual(self.deferred(queryset), set())
+
+    def test_not_overriding_deferred_fields(self):
+        self.queryset = self.queryset.defer('content')
+        queryset = self.project(['title'])
+        self.assertEqual(self.deferred(queryset), set(['content']))
+
+    def test_fetching_values(self):
+        queryset = self.project(['title', 'author__name'], values=True)
+        self.assertEqual(
+                list(queryset)[0],
+                {'title': 'Article 0', 'author__name': 'John'})
+
+    def test_prefetching_reverse_relations(self):
+        from .testapp.models import Author
+
+        self.queryset = Author.objects.all()
+        queryset = self.project(['name', 'articles'], values=True)
+
+        self.assertEqual(queryset._prefetch_related_lookups, ['articles'])
+        self.assertFalse(isinstance(list(queryset)[0], dict))
+
+    def test_not_projecting_without_field_api(self):
+        from restosaur import projection
+
+        supports_projection = projection.supports_projection
+        projection.supports_projection = lambda model: False
+
+        try:
+            queryset = self.project(['title', 'author__name'], values=True)
+        finally:
+            projection.supports_projection = supports_projection
+
+        self.assertTrue(queryset is self.queryset)
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class ModelRepresentationProjectionTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+        from .testapp import create_tables
+        from .testapp.models import Author, Article
+
+        create_tables()
+        Article.objects.all().delete()
+
+        author = Author.objects.create(name='John')
+
+        for x in range(3):
+            Article.objects.create(
+                    author=author, title='Article %d' % x,
+                    published=datetime.datetime(2016, 1, 1), rating=x)
+
+        class ArticleRepresentation(ModelRepresentation):
+            fields = (
+                'id', 'title', ('author', 'author.name'),
+                ('stars', lambda obj, ctx: '*' * obj.rating))
+            requires = ('rating',)
+
+        class ArticleRowRepresentation(ArticleRepresentation):
+            fields = ('id', 'title', ('author', 'author.name'))
+            use_values = True
+
+        self.representation = ArticleRepresentation()
+        self.row_representation = ArticleRowRepresentation()
+        self.queryset = Article.objects.order_by('pk')
+
+        self.rqfactory = RequestFactory()
+        self.api = API('/')
+        self.articles = self.api.resource('articles')
+
+        @self.articles.get()
+        def articles_GET(ctx):
+            return ctx.Collection(self.queryset)
+
+        self.articles.representation()(self.representation)
+        self.articles.representation('vnd.rows')(self.row_representation)
+
+    def call(self, query=None, **extra):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        rq = self.rqfactory.get('/articles', query or {}, **extra)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = resource_dispatcher_factory(self.api, self.articles)(rq)
+
+        return json.loads(resp.content), queries
+
+    def test_reporting_lookups_of_fields_and_requirements(self):
+        self.assertEqual(
+                self.representation.get_lookups(FieldsContext()),
+                (['id', 'title', 'author__name', 'rating'], True))
+
+    def test_reporting_lookups_of_requested_fields(self):
+        ctx = FieldsContext(frozenset(['title']))
+        self.assertEqual(
+                self.representation.get_lookups(ctx), (['title'], True))
+
+    def test_reporting_incomplete_lookups_of_computed_fields(self):
+        class UnknownRepresentation(ModelRepresentation):
+            fields = ('title', ('stars', lambda obj, ctx: obj.rating))
+
+        self.assertEqual(
+                UnknownRepresentation().get_lookups(FieldsContext()),
+                (['title'], False))
+
+    def test_converting_projected_collection(self):
+        data, queries = self.call()
+        self.assertEqual(data['items'][1], {
+            'id': data['items'][1]['id'], 'title': 'Article 1',
+            'author': 'John', 'stars': '*'})
+        self.assertEqual(len(queries), 1)
+        self.assertFalse('content' in queries[0]['sql'])
+
+    def test_converting_collection_of_rows(self):
+        data, queries = self.call(
+                HTTP_ACCEPT='application/vnd.rows+json')
+        self.assertEqual(
+                [item['author'] for item in data['items']], ['John'] * 3)
+        self.assertEqual(len(queries), 1)
+
+    def test_converting_row_dicts(self):
+        row = {'id': 1, 'title': 'foo', 'author__name': 'John'}
+        self.assertEqual(
+                self.row_representation(row, FieldsContext()),
+                {'id': 1, 'title': 'foo', 'author': 'John'})
@@ -0,0 +1,261 @@
+import datetime
+import json
+import unittest
+from collections import OrderedDict
+
+import django
+
+from restosaur import API
+from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.representations import (
+        FieldsRepresentation, ModelRepresentation, Representation,
+        parse_fields, select_fields)
+
+
+class FieldsContext(object):
+    def __init__(self, fields=None):
+        self.fields = fields
+
+
+class SparseFieldsTestCase(unittest.TestCase):
+    def test_parsing_comma_separated_fields(self):
+        self.assertEqual(
+                parse_fields(['id, title', 'author']),
+                frozenset(['id', 'title', 'author']))
+
+    def test_parsing_empty_fields(self):
+        self.assertEqual(parse_fields([]), None)
+        self.assertEqual(parse_fields([' , ']), None)
+
+    def test_selecting_fields(self):
+        self.assertEqual(
+                select_fields({'id': 1, 'title': 'foo'}, frozenset(['id'])),
+                {'id': 1})
+
+    def test_keeping_order_of_selected_fields(self):
+        data = OrderedDict([('c', 1), ('b', 2), ('a', 3)])
+        self.assertEqual(
+                list(select_fields(data, frozenset(['a', 'c']))), ['c', 'a'])
+
+
+class RepresentationTestCase(unittest.TestCase):
+    def test_converting_object_with_links(self):
+        representation = Representation(None)
+        representation.links = {'self': '/items/1'}
+        self.assertEqual(
+                representation.to_dict({'id': 1}),
+                {'id': 1, '_links': {'self': '/items/1'}})
+
+
+class FieldsRepresentationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = calls = []
+
+        def comments(obj, ctx):
+            calls.append('comments')
+            return 42
+
+        self.representation = FieldsRepresentation(
+                id=lambda obj, ctx: obj['pk'],
+                title=lambda obj, ctx: obj['title'],
+                comments=comments)
+        self.obj = {'pk': 1, 'title': 'foo'}
+
+    def test_computing_all_fields(self):
+        self.assertEqual(
+                self.representation(self.obj, FieldsContext()),
+                {'id': 1, 'title': 'foo', 'comments': 42})
+
+    def test_not_computing_fields_which_were_not_requested(self):
+        ctx = FieldsContext(frozenset(['id', 'title']))
+        self.assertEqual(
+                self.representation(self.obj, ctx), {'id': 1, 'title': 'foo'})
+        self.assertEqual(self.calls, [])
+
+
+class ResourceSparseFieldsTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+
+        self.rqfactory = RequestFactory()
+        self.api = API('/')
+        self.entity = self.api.resource('entity')
+        self.lazy = self.api.resource('lazy')
+
+        @self.entity.get()
+        def entity_GET(ctx):
+            return ctx.Entity({'id': 1, 'title': 'foo', 'content': 'bar'})
+
+        @self.entity.representation()
+        def entity_repr(obj, ctx):
+            return obj
+
+        @self.lazy.get()
+        def lazy_GET(ctx):
+            return ctx.Collection([{'id': 1}, {'id': 2}], version=1)
+
+        self.lazy.representation()(FieldsRepresentation(
+            id=lambda obj, ctx: obj['id'],
+            double=lambda obj, ctx: obj['id'] * 2))
+
+    def call(self, resource, data=None, **extra):
+        rq = self.rqfactory.get(resource.path, data or {}, **extra)
+        return resource_dispatcher_factory(self.api, resource)(rq)
+
+    def test_returning_all_fields_by_default(self):
+        data = json.loads(self.call(self.entity).content)
+        self.assertEqual(
+                set(data), set(['id', 'title', 'content', '_links']))
+
+    def test_limiting_fields_of_plain_representation(self):
+        data = json.loads(
+                self.call(self.entity, {'fields': 'id,title'}).content)
+        self.assertEqual(set(data), set(['id', 'title', '_links']))
+
+    def test_limiting_fields_of_collection_items(self):
+        data = json.loads(self.call(self.lazy, {'fields': 'double'}).content)
+        self.assertEqual(data['items'], [{'double': 2}, {'double': 4}])
+
+    def test_varying_etag_by_requested_fields(self):
+        etag = self.call(self.lazy)['ETag']
+        sparse_etag = self.call(self.lazy, {'fields': 'id'})['ETag']
+        self.assertNotEqual(etag, sparse_etag)
+
+
+class ItemRepresentation(ModelRepresentation):
+    fields = (
+        'id', 'name', ('owner', 'owner.name'),
+        ('double', lambda obj, ctx: obj.id * 2))
+
+
+class Owner(object):
+    name = 'John'
+
+
+class Item(object):
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.owner = Owner()
+
+
+class ModelRepresentationTestCase(unittest.TestCase):
+    def test_converting_declared_fields(self):
+        self.assertEqual(
+                ItemRepresentation().to_dict(Item(1, 'foo'), None),
+                {'id': 1, 'name': 'foo', 'owner': 'John', 'double': 2})
+
+    def test_compiling_fields_at_class_creation(self):
+        self.assertEqual(
+                ItemRepresentation.compiled_fields.keys,
+                ('id', 'name', 'owner'))
+
+    def test_converting_single_attribute(self):
+        class NameRepresentation(ModelRepresentation):
+            fields = ('name',)
+
+        self.assertEqual(
+                NameRepresentation()(Item(1, 'foo'), None), {'name': 'foo'})
+
+    def test_converting_requested_fields_only(self):
+        ctx = FieldsContext(frozenset(['name', 'double']))
+        self.assertEqual(
+                ItemRepresentation()(Item(1, 'foo'), ctx),
+                {'name': 'foo', 'double': 2})
+
+    def test_inheriting_declared_fields(self):
+        class ExtendedRepresentation(ItemRepresentation):
+            pass
+
+        self.assertEqual(
+                ExtendedRepresentation.declared_fields,
+                ItemRepresentation.declared_fields)
+
+    def test_converting_none_for_paths_traversing_none(self):
+        item = Item(1, 'foo')
+        item.owner = None
+        self.assertEqual(
+                ItemRepresentation().to_dict(item, None),
+                {'id': 1, 'name': 'foo', 'owner': None, 'double': 2})
+
+    def test_raising_attribute_error_for_missing_attributes(self):
+        class MissingRepresentation(ModelRepresentation):
+            fields = ('id', ('owner', 'owner.missing'))
+
+        self.assertRaises(
+                AttributeError, MissingRepresentation().to_dict,
+                Item(1, 'foo'))
+
+    def test_converting_using_context_passed_to_constructor(self):
+        ctx = FieldsContext(frozenset(['name']))
+        self.assertEqual(
+                ItemRepresentation(ctx).to_dict(Item(1, 'foo')),
+                {'name': 'foo'})
+
+    def test_rejecting_fields_declared_as_string(self):
+        def declare():
+            class InvalidRepresentation(ModelRepresentation):
+                fields = 'title'
+
+        self.assertRaises(TypeError, declare)
+
+    @unittest.skipIf(django.VERSION < (1, 7), 'app registry is required')
+    def test_converting_all_fields_same_as_model_to_dict(self):
+        from django.forms.models import model_to_dict
+        from .testapp.models import Article, Author
+
+        class ArticleRepresentation(ModelRepresentation):
+            model = Article
+            fields = '__all__'
+
+        article = Article(
+                pk=1, author=Author(pk=2, name='John'), title='foo',
+                published=datetime.datetime(2016, 7, 1), rating=3)
+
+        self.assertEqual(
+                ArticleRepresentation().to_dict(article),
+                model_to_dict(article))
+
+    @unittest.skipIf(django.VERSION < (1, 7), 'app registry is required')
+    def test_building_model_form_of_declared_fields(self):
+        from .testapp.models import Article
+
+        class ArticleRepresentation(ModelRepresentation):
+            model = Article
+            fields = ('title', ('author', 'author.name'), 'rating')
+
+        form_class = ArticleRepresentation().get_form()
+        self.assertEqual(list(form_class.base_fields), ['title', 'rating'])
+
+
+@unittest.skipIf(
+        django.VERSION < (1, 7, 0),
+        'Not supported for Django %s' % django.get_version())
+class NullableRelationRepresentationTestCase(unittest.TestCase):
+    def setUp(self):
+        from .testapp import create_tables
+        from .testapp.models import Article, Author, Comment
+
+        create_tables()
+        Comment.objects.all().delete()
+
+        author = Author.objects.create(name='John')
+        article = Article.objects.create(
+                author=author, title='foo',
+                published=datetime.datetime(2016, 7, 1))
+        Comment.objects.create(article=article, author=author, text='bar')
+        Comment.objects.create(article=article, author=None, text='baz')
+
+        class CommentRepresentation(ModelRepresentation):
+            fields = ('text', ('author', 'author.name'))
+
+        self.representation = CommentRepresentation()
+
+    def test_converting_nullable_foreign_key(self):
+        from .testapp.models import Comment
+
+        self.assertEqual(
+                [self.representation(comment, None)
+                 for comment in Comment.objects.order_by('pk')],
+                [{'text': 'bar', 'author': 'John'},
+                 {'text': 'baz', 'author': None}])
@@ -4,7 +4,7 @@ import json
 
 from restosaur import API, responses
 from restosaur.resource import Resource
-from restosaur.dispatch import resource_dispatcher_factory
+from restosaur.dispatch import build_context, resource_dispatcher_factory
 
 from django.test import SimpleTestCase
 
@@ -290,3 +290,381 @@ class ExceptionsHandlingTestCase(ResourceTestCase, SimpleTestCase):
         resp = self.call(self.notimpl_resource, 'get')
         self.assertEqual(resp.status_code, 501)
 
+
+class NegotiationCacheTestCase(ResourceTestCase):
+    def setUp(self):
+        super(NegotiationCacheTestCase, self).setUp()
+
+        self.entity = self.api.resource('cached-entity')
+
+        @self.entity.get()
+        def entity_GET(ctx):
+            return ctx.Entity({'some': 'test'})
+
+    def test_counting_miss_for_first_negotiation(self):
+        self.call(self.entity, 'get', HTTP_ACCEPT='application/json')
+        self.assertEqual(self.entity.negotiation_cache.misses, 1)
+        self.assertEqual(self.entity.negotiation_cache.hits, 0)
+
+    def test_counting_hit_for_repeated_accept_header(self):
+        self.call(self.entity, 'get', HTTP_ACCEPT='application/json')
+        self.call(self.entity, 'get', HTTP_ACCEPT='application/json')
+        self.assertEqual(self.entity.negotiation_cache.hits, 1)
+
+    def test_returning_resolved_triple(self):
+        content_type, serializer, representation = self.entity.negotiate(
+                'application/json')
+        self.assertEqual(content_type, 'application/json')
+        self.assertTrue(serializer is self.entity.serializers['application/json'])
+        self.assertEqual(representation, '__default__')
+
+    def test_caching_not_acceptable_result(self):
+        self.call(self.entity, 'get', HTTP_ACCEPT='application/eggsandmeat')
+        resp = self.call(self.entity, 'get', HTTP_ACCEPT='application/eggsandmeat')
+        self.assertEqual(resp.status_code, 406)
+        self.assertEqual(self.entity.negotiation_cache.hits, 1)
+
+    def test_invalidating_cache_when_registering_representation(self):
+        accept = 'application/vnd.custom+json'
+        resp = self.call(self.entity, 'get', HTTP_ACCEPT=accept)
+        self.assertEqual(resp.status_code, 406)
+
+        @self.entity.representation('vnd.custom')
+        def custom_repr(obj, ctx):
+            return obj
+
+        resp = self.call(self.entity, 'get', HTTP_ACCEPT=accept)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], accept)
+
+    def test_invalidating_cache_when_registering_serializer(self):
+        from restosaur.serializers import SerializersRegistry, JsonSerializer
+
+        registry = SerializersRegistry()
+        registry.register('application/json', JsonSerializer())
+        resource = self.api.resource('custom-serializers', serializers=registry)
+
+        self.assertTrue(resource.negotiate('text/plain') is None)
+        registry.register('text/plain', JsonSerializer())
+        self.assertFalse(resource.negotiate('text/plain') is None)
+
+    def test_discarding_least_recently_used_entries(self):
+        from restosaur.utils import LRUCache
+
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+
+
+class StreamingCollectionTestCase(ResourceTestCase):
+    def setUp(self):
+        super(StreamingCollectionTestCase, self).setUp()
+
+        self.collection = self.api.resource('streamed')
+
+        @self.collection.get()
+        def collection_GET(ctx):
+            items = (dict(id=x) for x in range(5))
+            return ctx.Collection(items, stream=True, extra={'foo': 'bar'})
+
+        @self.collection.representation()
+        def item_repr(obj, ctx):
+            return {'pk': obj['id']}
+
+    def test_returning_streaming_response(self):
+        resp = self.call(self.collection, 'get')
+        self.assertTrue(resp.streaming)
+
+    def test_streaming_valid_json_content(self):
+        resp = self.call(self.collection, 'get')
+        data = json.loads(''.join(resp.streaming_content))
+        self.assertEqual(data['items'], [{'pk': x} for x in range(5)])
+        self.assertEqual(data['foo'], 'bar')
+        self.assertTrue('_links' in data)
+
+    def test_counting_streamed_items(self):
+        resp = self.call(self.collection, 'get')
+        data = json.loads(''.join(resp.streaming_content))
+        self.assertEqual(data['totalCount'], 5)
+
+    def test_splitting_output_into_chunks(self):
+        from restosaur.serializers import JsonSerializer
+
+        chunks = list(JsonSerializer().dumps_iter(
+            'items', iter(range(100)), lambda: {}, chunk_size=10))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(json.loads(''.join(chunks))['items'], range(100))
+
+    def test_streaming_empty_collection(self):
+        from restosaur.serializers import JsonSerializer
+
+        content = ''.join(JsonSerializer().dumps_iter(
+            'items', iter([]), lambda: {'totalCount': 0}))
+        self.assertEqual(json.loads(content), {'items': [], 'totalCount': 0})
+
+
+class BatchRepresentationTestCase(ResourceTestCase):
+    def setUp(self):
+        super(BatchRepresentationTestCase, self).setUp()
+
+        self.batches = []
+        self.collection = self.api.resource('batch')
+
+        @self.collection.get()
+        def collection_GET(ctx):
+            return ctx.Collection(range(5))
+
+        @self.collection.representation(batch=True)
+        def items_as_dicts(objs, ctx):
+            objs = list(objs)
+            self.batches.append(objs)
+            return [{'pk': x} for x in objs]
+
+    def test_converting_whole_collection_at_once(self):
+        resp = self.call(self.collection, 'get')
+        data = json.loads(resp.content)
+        self.assertEqual(data['items'], [{'pk': x} for x in range(5)])
+        self.assertEqual(self.batches, [range(5)])
+
+    def test_converting_single_object_using_batch_representation(self):
+        self.assertEqual(self.collection.convert(None, 3), {'pk': 3})
+
+    def test_negotiating_batch_only_representation(self):
+        @self.collection.representation('vnd.short', batch=True)
+        def items_short(objs, ctx):
+            return list(objs)
+
+        resp = self.call(
+                self.collection, 'get',
+                HTTP_ACCEPT='application/vnd.short+json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.content)['items'], range(5))
+
+    def test_converting_streamed_collection_in_batches(self):
+        from restosaur.serializers import JsonSerializer
+
+        rq = self.rqfactory.get('batch')
+        ctx = build_context(self.api, self.collection, rq)
+        response = ctx.Collection(range(5), stream=True)
+        response.batch_size = 2
+        content = ''.join(response.serialize_iter(JsonSerializer(), None))
+        self.assertEqual(json.loads(content)['items'], [{'pk': x} for x in range(5)])
+        self.assertEqual(self.batches, [[0, 1], [2, 3], [4]])
+
+
+class ConditionalGetTestCase(ResourceTestCase):
+    def setUp(self):
+        super(ConditionalGetTestCase, self).setUp()
+
+        self.serialized = []
+        self.hashed = self.api.resource('hashed')
+        self.versioned = self.api.resource('versioned')
+
+        @self.hashed.get()
+        def hashed_GET(ctx):
+            return ctx.Entity({'some': 'test'}, etag=True)
+
+        @self.versioned.get()
+        @self.versioned.post()
+        def versioned_GET(ctx):
+            return ctx.Entity({'some': 'test'}, version=42, weak_etag=True)
+
+        @self.versioned.representation()
+        def versioned_repr(obj, ctx):
+            self.serialized.append(obj)
+            return obj
+
+    def test_setting_etag_computed_from_body(self):
+        resp = self.call(self.hashed, 'get')
+        self.assertTrue(resp['ETag'].startswith('"'))
+
+    def test_returning_same_etag_for_same_body(self):
+        self.assertEqual(
+                self.call(self.hashed, 'get')['ETag'],
+                self.call(self.hashed, 'get')['ETag'])
+
+    def test_returning_not_modified_for_matching_etag(self):
+        etag = self.call(self.hashed, 'get')['ETag']
+        resp = self.call(self.hashed, 'get', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, '')
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_returning_body_for_not_matching_etag(self):
+        resp = self.call(self.hashed, 'get', HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.content), {'some': 'test', '_links': {}})
+
+    def test_setting_weak_etag_computed_from_version(self):
+        resp = self.call(self.versioned, 'get')
+        self.assertTrue(resp['ETag'].startswith('W/"'))
+
+    def test_skipping_serialization_for_matching_version(self):
+        etag = self.call(self.versioned, 'get')['ETag']
+        del self.serialized[:]
+        resp = self.call(self.versioned, 'get', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(self.serialized, [])
+
+    def test_matching_any_etag_with_asterisk(self):
+        resp = self.call(self.versioned, 'get', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(resp.status_code, 304)
+
+    def test_ignoring_if_none_match_for_unsafe_methods(self):
+        etag = self.call(self.versioned, 'get')['ETag']
+        resp = self.call(self.versioned, 'post', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+
+class LinksTestCase(ResourceTestCase):
+    def setUp(self):
+        super(LinksTestCase, self).setUp()
+
+        self.entity = self.api.resource('linked/:pk')
+        self.collection = self.api.resource('linked')
+        self.parent = self.api.resource('parents/:pk')
+
+        @self.entity.get()
+        def entity_GET(ctx):
+            return ctx.Entity({'some': 'test'})
+
+        @self.collection.post(link_to=self.entity, link_as='create')
+        def collection_POST(ctx):
+            return ctx.Created()
+
+        @self.parent.get(link_to=self.entity, link_as='parent')
+        def parent_GET(ctx):
+            return ctx.Entity({})
+
+    def links(self, *args, **kw):
+        resp = self.call(self.entity, 'get', *args, **kw)
+        return json.loads(resp.content)['_links']
+
+    def test_linking_resource_without_parameters(self):
+        self.assertEqual(self.links()['create'], {
+            'uri': 'http://testserver/linked', 'method': 'POST'})
+
+    def test_linking_resource_with_parameters(self):
+        self.assertEqual(
+                self.links({'pk': 5})['parent']['uri'],
+                'http://testserver/parents/5')
+
+    def test_memoizing_links_per_scheme_and_host(self):
+        self.links()
+        links = self.links(**{'wsgi.url_scheme': 'https', 'SERVER_PORT': '443'})
+        self.assertEqual(
+                links['create']['uri'], 'https://testserver/linked')
+
+    def test_not_sharing_memoized_link_dicts(self):
+        ctx = build_context(self.api, self.entity, self.rqfactory.get('/'))
+        self.entity.get_links(ctx)['create']['uri'] = 'changed'
+        self.assertEqual(
+                self.entity.get_links(ctx)['create']['uri'],
+                'http://testserver/linked')
+
+    def test_caching_base_uri_on_context(self):
+        ctx = build_context(self.api, self.entity, self.rqfactory.get('/'))
+        self.assertEqual(ctx.base_uri, 'http://testserver')
+
+
+class StreamingRequestBodyTestCase(ResourceTestCase):
+    def setUp(self):
+        super(StreamingRequestBodyTestCase, self).setUp()
+
+        self.bulk = self.api.resource('bulk')
+        self.received = received = []
+
+        @self.bulk.post(stream=True)
+        def bulk_POST(ctx):
+            for item in ctx.body:
+                received.append(item)
+            return ctx.Created({'count': len(received)})
+
+        @self.bulk.representation()
+        def bulk_repr(obj, ctx):
+            return obj
+
+    def post(self, content):
+        return self.call(
+                self.bulk, 'post', content,
+                content_type='application/json')
+
+    def test_body_is_a_generator_of_items(self):
+        self.post(json.dumps([{'id': x} for x in range(3)]))
+        self.assertEqual(self.received, [{'id': x} for x in range(3)])
+
+    def test_body_is_not_read_before_callback(self):
+        rq = self.rqfactory.post(
+                self.bulk.path, '[1, 2]', content_type='application/json')
+        ctx = build_context(self.api, self.bulk, rq)
+        self.bulk(ctx)
+        self.assertFalse(hasattr(rq, '_body'))
+        self.assertEqual(self.received, [1, 2])
+
+    def test_decoding_body_using_request_charset(self):
+        # the test client encodes the body using the charset
+        self.call(
+                self.bulk, 'post', u'["za\u017c\xf3\u0142\u0107"]',
+                content_type='application/json; charset=iso-8859-2')
+        self.assertEqual(self.received, [u'za\u017c\xf3\u0142\u0107'])
+
+    def test_invalid_array_returns_server_error(self):
+        resp = self.post('{"id": 1}')
+        self.assertEqual(resp.status_code, 500)
+
+
+def msgpack_available():
+    from restosaur.serializers import MsgpackSerializer, SerializerUnavailable
+    try:
+        MsgpackSerializer()
+    except SerializerUnavailable:
+        return False
+    return True
+
+
+@unittest.skipUnless(msgpack_available(), 'msgpack is not available')
+class BinarySerializerNegotiationTestCase(ResourceTestCase):
+    def setUp(self):
+        from restosaur.serializers import (
+                JsonSerializer, MsgpackSerializer, SerializersRegistry)
+
+        super(BinarySerializerNegotiationTestCase, self).setUp()
+
+        self.serializer = MsgpackSerializer()
+        registry = SerializersRegistry()
+        registry.register('application/json', JsonSerializer())
+        registry.register('application/msgpack', self.serializer)
+
+        self.entity = self.api.resource('binary', serializers=registry)
+
+        @self.entity.get()
+        def entity_GET(ctx):
+            return ctx.Entity({'date': datetime.date(2016, 7, 1)})
+
+        @self.entity.representation()
+        def entity_repr(obj, ctx):
+            return obj
+
+        @self.entity.representation('vnd.item')
+        def entity_vnd_repr(obj, ctx):
+            return {'vnd': True}
+
+    def loads(self, resp):
+        ctx = type('Context', (object,), {'raw': resp.content})()
+        return self.serializer.loads(ctx)
+
+    def test_negotiating_binary_content_type(self):
+        resp = self.call(
+                self.entity, 'get', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(resp['Content-Type'], 'application/msgpack')
+        self.assertEqual(self.loads(resp)['date'], '2016-07-01')
+
+    def test_negotiating_vendor_binary_content_type(self):
+        resp = self.call(
+                self.entity, 'get', HTTP_ACCEPT='application/vnd.item+msgpack')
+        self.assertEqual(resp['Content-Type'], 'application/vnd.item+msgpack')
+        self.assertEqual(self.loads(resp)['vnd'], True)
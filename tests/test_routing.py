@@ -0,0 +1,52 @@
+import unittest
+
+from restosaur.routing import Router
+
+
+class RouterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.router = Router()
+        for path in (
+                '/', 'items', 'items/', 'items/:pk', 'items/:pk/tags/:tag',
+                'items/new', 'items/:pk/edit', 'files/:name.json'):
+            self.router.add(path, path)
+
+    def test_resolving_root(self):
+        self.assertEqual(self.router.resolve(''), ('/', {}))
+
+    def test_resolving_literal_path(self):
+        self.assertEqual(self.router.resolve('items'), ('items', {}))
+
+    def test_resolving_trailing_slash(self):
+        self.assertEqual(self.router.resolve('items/'), ('items/', {}))
+
+    def test_extracting_parameters(self):
+        self.assertEqual(
+                self.router.resolve('items/1/tags/foo'),
+                ('items/:pk/tags/:tag', {'pk': '1', 'tag': 'foo'}))
+
+    def test_matching_literals_before_parameters(self):
+        self.assertEqual(self.router.resolve('items/new'), ('items/new', {}))
+        self.assertEqual(
+                self.router.resolve('items/1'), ('items/:pk', {'pk': '1'}))
+
+    def test_falling_back_to_parameter_segment(self):
+        self.assertEqual(
+                self.router.resolve('items/new/edit'),
+                ('items/:pk/edit', {'pk': 'new'}))
+
+    def test_matching_partial_parameter_segments(self):
+        self.assertEqual(
+                self.router.resolve('files/foo.json'),
+                ('files/:name.json', {'name': 'foo'}))
+
+    def test_not_matching_empty_parameter(self):
+        self.assertEqual(self.router.resolve('items//edit'), None)
+
+    def test_not_matching_unknown_path(self):
+        self.assertEqual(self.router.resolve('items/1/unknown'), None)
+
+    def test_resolving_first_registered_template(self):
+        self.router.add('items/:id', 'other')
+        self.assertEqual(
+                self.router.resolve('items/1'), ('items/:pk', {'pk': '1'}))
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import json
+import unittest
+
+from restosaur import serializers
+
+
+def backend_available(name):
+    try:
+        serializers.get_json_backend(name)
+    except serializers.JsonBackendUnavailable:
+        return False
+    return True
+
+
+PAYLOADS = [
+    None,
+    True,
+    1,
+    2**70,
+    1.5,
+    u'zaż\xf3łć gęślą jaźń',
+    'http://testserver/foo/',
+    [1, 'two', None],
+    {'nested': {'list': [1, 2, {'deep': True}]}},
+    {'date': datetime.date(2016, 7, 1)},
+    {'datetime': datetime.datetime(2016, 7, 1, 12, 30, 15, 123)},
+    {'timedelta': datetime.timedelta(hours=1, minutes=2, seconds=3)},
+    {'decimal': decimal.Decimal('10.25')},
+    ]
+
+
+class JsonBackendConformanceMixin(object):
+    backend = None
+
+    def setUp(self):
+        super(JsonBackendConformanceMixin, self).setUp()
+        self.reference = serializers.get_json_backend('json')
+        self.serializer = serializers.JsonSerializer(self.backend)
+
+    def test_encoding_payloads_same_as_standard_library(self):
+        for payload in PAYLOADS:
+            self.assertEqual(
+                    json.loads(self.serializer.dumps(payload)),
+                    json.loads(self.reference.dumps(payload)))
+
+    def test_encoding_dates(self):
+        data = json.loads(self.serializer.dumps({
+            'date': datetime.date(2016, 7, 1),
+            'datetime': datetime.datetime(2016, 7, 1, 12, 30),
+            'timedelta': datetime.timedelta(minutes=90),
+            }))
+        self.assertEqual(data['date'], '2016-07-01')
+        self.assertEqual(data['datetime'], '2016-07-01T12:30:00')
+        self.assertEqual(data['timedelta'], '01:30:00')
+
+    def test_encoding_decimal_as_number(self):
+        data = json.loads(self.serializer.dumps(decimal.Decimal('1.10')))
+        self.assertEqual(data, 1.1)
+
+    def test_raising_type_error_for_unsupported_objects(self):
+        self.assertRaises(TypeError, self.serializer.dumps, object())
+
+    def test_decoding_payloads_same_as_standard_library(self):
+        for payload in PAYLOADS:
+            content = self.reference.dumps(payload)
+            self.assertEqual(
+                    self.serializer._json.loads(content),
+                    self.reference.loads(content))
+
+
+class StdlibJsonBackendTestCase(
+        JsonBackendConformanceMixin, unittest.TestCase):
+    backend = 'json'
+
+
+@unittest.skipUnless(
+        backend_available('simplejson'), 'simplejson is not available')
+class SimpleJsonBackendTestCase(
+        JsonBackendConformanceMixin, unittest.TestCase):
+    backend = 'simplejson'
+
+
+class JsonBackendSelectionTestCase(unittest.TestCase):
+    def test_selecting_available_backend_by_default(self):
+        backend = serializers.get_json_backend()
+        self.assertTrue(backend_available(backend.name))
+
+    def test_selecting_backend_by_name(self):
+        backend = serializers.get_json_backend('json')
+        self.assertEqual(backend.name, 'json')
+
+    def test_raising_key_error_for_unknown_backend(self):
+        self.assertRaises(KeyError, serializers.get_json_backend, 'foo')
+
+
+class IterJsonArrayTestCase(unittest.TestCase):
+    def items(self, content, chunk_size=1):
+        import io
+        return list(serializers.iter_json_array(
+            io.BytesIO(content), chunk_size=chunk_size))
+
+    def test_decoding_items_split_between_chunks(self):
+        content = json.dumps(PAYLOADS[:9] + [-0.25, 1.5e30, u'"\\]'])
+        self.assertEqual(self.items(content), json.loads(content))
+
+    def test_decoding_multibyte_characters(self):
+        content = json.dumps([u'zaż\xf3łć'], ensure_ascii=False)
+        self.assertEqual(
+                self.items(content.encode('utf-8')), [u'zaż\xf3łć'])
+
+    def test_decoding_empty_array(self):
+        self.assertEqual(self.items(' [ ] '), [])
+
+    def test_raising_value_error_for_invalid_arrays(self):
+        for content in ('', '{}', '[1 2]', '[1,', '[1,]', '[tru]'):
+            self.assertRaises(ValueError, self.items, content)
+
+    def test_raising_value_error_for_data_after_array(self):
+        for content in ('[1] garbage', '[1]]', '[] []'):
+            self.assertRaises(ValueError, self.items, content)
+
+    def test_allowing_whitespace_after_array(self):
+        self.assertEqual(self.items('[1] \n'), [1])
+
+
+def serializer_available(serializer_class):
+    try:
+        serializer_class()
+    except serializers.SerializerUnavailable:
+        return False
+    return True
+
+
+class BinarySerializerConformanceMixin(object):
+    serializer_class = None
+
+    def setUp(self):
+        super(BinarySerializerConformanceMixin, self).setUp()
+        self.serializer = self.serializer_class()
+        self.reference = serializers.get_json_backend('json')
+
+    def roundtrip(self, payload):
+        ctx = type('Context', (object,), {
+            'raw': self.serializer.dumps(payload)})()
+        return self.serializer.loads(ctx)
+
+    def test_encoding_payloads_same_as_json(self):
+        for payload in PAYLOADS:
+            if payload == 2**70:
+                continue
+            self.assertEqual(
+                    self.roundtrip(payload),
+                    json.loads(self.reference.dumps(payload)))
+
+    def test_encoding_dates_as_strings(self):
+        data = self.roundtrip({
+            'date': datetime.date(2016, 7, 1),
+            'datetime': datetime.datetime(2016, 7, 1, 12, 30),
+            'timedelta': datetime.timedelta(minutes=90),
+            })
+        self.assertEqual(data, {
+            'date': u'2016-07-01',
+            'datetime': u'2016-07-01T12:30:00',
+            'timedelta': u'01:30:00',
+            })
+        self.assertTrue(isinstance(data['date'], unicode))
+
+    def test_encoding_decimal_as_number(self):
+        self.assertEqual(self.roundtrip(decimal.Decimal('1.10')), 1.1)
+
+    def test_raising_type_error_for_unsupported_objects(self):
+        self.assertRaises(TypeError, self.serializer.dumps, object())
+
+
+@unittest.skipUnless(
+        serializer_available(serializers.MsgpackSerializer),
+        'msgpack is not available')
+class MsgpackSerializerTestCase(
+        BinarySerializerConformanceMixin, unittest.TestCase):
+    serializer_class = serializers.MsgpackSerializer
+
+
+@unittest.skipUnless(
+        serializer_available(serializers.CborSerializer),
+        'cbor2 is not available')
+class CborSerializerTestCase(
+        BinarySerializerConformanceMixin, unittest.TestCase):
+    serializer_class = serializers.CborSerializer
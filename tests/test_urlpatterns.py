@@ -32,3 +32,26 @@ class URLPatternsTestCase(SimpleTestCase):
             resp = c.get('/api/')
             self.assertEqual(resp.status_code, 200)
 
+
+    def test_calling_apiroot_using_single_route(self):
+        c = Client()
+
+        with self.settings(ROOT_URLCONF='tests.urls_single_route'):
+            resp = c.get('/api/')
+            self.assertEqual(json.loads(resp.content)['root'], 'ok')
+
+    def test_passing_parameters_using_single_route(self):
+        c = Client()
+
+        with self.settings(ROOT_URLCONF='tests.urls_single_route'):
+            resp = c.get('/api/items/1')
+            resp_json = json.loads(resp.content)
+            self.assertEqual(resp_json['pk'], '1')
+            self.assertEqual(resp_json['parameter'], '1')
+
+    def test_not_found_using_single_route(self):
+        c = Client()
+
+        with self.settings(ROOT_URLCONF='tests.urls_single_route'):
+            resp = c.get('/api/unknown')
+            self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,45 @@
+import unittest
+
+from restosaur import urltemplate
+
+
+class URLTemplateTestCase(unittest.TestCase):
+    def test_expanding_parameters(self):
+        tpl = urltemplate.URLTemplate('/foo/:pk/bar/:slug')
+        self.assertEqual(
+                tpl.expand({'pk': 1, 'slug': 'baz'}), '/foo/1/bar/baz')
+
+    def test_expanding_template_without_parameters(self):
+        tpl = urltemplate.URLTemplate('/foo/bar/')
+        self.assertEqual(tpl.expand({'pk': 1}), '/foo/bar/')
+
+    def test_leaving_missing_parameters_in_non_strict_mode(self):
+        tpl = urltemplate.URLTemplate('/foo/:pk')
+        self.assertEqual(tpl.expand({}), '/foo/:pk')
+
+    def test_raising_key_error_for_missing_parameters_in_strict_mode(self):
+        tpl = urltemplate.URLTemplate('/foo/:pk')
+        self.assertRaises(KeyError, tpl.expand, {}, strict=True)
+
+    def test_not_replacing_parameters_sharing_a_prefix(self):
+        tpl = urltemplate.URLTemplate('/:pk/:pkx')
+        self.assertEqual(tpl.expand({'pk': 1, 'pkx': 2}), '/1/2')
+
+    def test_removing_parameters(self):
+        self.assertEqual(
+                urltemplate.remove_parameters('foo/:pk/bar/'), 'foo/bar/')
+
+    def test_converting_to_django_urlpattern(self):
+        self.assertEqual(
+                urltemplate.to_django_urlpattern('foo/:pk/bar'),
+                'foo/(?P<pk>[^/]+)/bar')
+
+    def test_to_url_shortcut(self):
+        self.assertEqual(
+                urltemplate.to_url('http://testserver/foo/:pk', {'pk': 2}),
+                'http://testserver/foo/2')
+
+    def test_reusing_compiled_templates(self):
+        self.assertTrue(
+                urltemplate.compile_template('foo/:pk') is
+                urltemplate.compile_template('foo/:pk'))
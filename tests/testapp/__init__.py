@@ -0,0 +1,14 @@
+def create_tables():
+    """
+    Creates tables of testapp models in the test database
+    """
+
+    from django.db import connection
+    from .models import Author, Article, Comment
+
+    existing = connection.introspection.table_names()
+
+    with connection.schema_editor() as editor:
+        for model in (Author, Article, Comment):
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'testapp'
+
+
+class Article(models.Model):
+    author = models.ForeignKey(Author, related_name='articles')
+    title = models.CharField(max_length=200)
+    content = models.TextField(blank=True)
+    published = models.DateTimeField()
+    rating = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = 'testapp'
+
+
+class Comment(models.Model):
+    article = models.ForeignKey(Article, related_name='comments')
+    author = models.ForeignKey(
+            Author, null=True, blank=True, related_name='comments')
+    text = models.TextField()
+
+    class Meta:
+        app_label = 'testapp'
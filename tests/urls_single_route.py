@@ -0,0 +1,18 @@
+from restosaur import API
+
+api = API('api', single_route=True)
+root = api.resource('/')
+item = api.resource('items/:pk')
+
+
+@root.get()
+def root_view(ctx):
+    return ctx.Response({'root': 'ok'})
+
+
+@item.get()
+def item_view(ctx, pk):
+    return ctx.Response({'pk': pk, 'parameter': ctx.parameters['pk']})
+
+
+urlpatterns = api.urlpatterns()